@@ -39,7 +39,7 @@ class AutoVCBot(commands.Bot):
             case_insensitive=True,
             strip_after_prefix=True
         )
-        self.initial_extensions = ["cogs.commands", "cogs.autovc", "cogs.tickets", "cogs.twitch", "cogs.youtube", "cogs.modlog"]
+        self.initial_extensions = ["cogs.commands", "cogs.autovc", "cogs.tickets", "cogs.twitch", "cogs.youtube", "cogs.modlog", "cogs.streamrole"]
     
     async def setup_hook(self):
         """Called when the bot is starting up"""
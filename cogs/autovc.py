@@ -4,11 +4,37 @@ from discord import app_commands
 import json
 import os
 import asyncio
+import time
+from typing import Literal
 import logging
+from collections import Counter, deque
+from datetime import datetime
 
 log = logging.getLogger("autovc_cog")
 CONFIG_FILE = "server_config.json"
 DATA_FILE = "data.json"
+EMPTY_CHANNEL_GRACE_SECONDS = 5  # wait this long after the last member leaves before deleting
+SWEEP_MINUTES = 10  # safety-net sweep for channels missed by voice events
+POOL_CHANNEL_NAME = "⏳ AutoVC"
+POOL_MAX_SIZE = 10
+POOL_IDLE_SECONDS = 30 * 60  # shrink a pool that has not been used for this long
+POOL_IDLE_SIZE = 1  # channels kept warm while idle
+RENAME_LIMIT = 2  # Discord allows this many channel renames...
+RENAME_WINDOW_SECONDS = 600  # ...per channel in this window
+EDIT_DEBOUNCE_SECONDS = 1.5  # coalesce control panel changes made within this window
+ADMISSION_CONCURRENCY = 2  # Join-to-Create requests served at once per guild
+METRIC_SAMPLES = 256  # recent samples kept per latency/lifetime metric
+RECONCILE_CONCURRENCY = 5  # orphaned channels deleted at once during startup reconciliation
+TEMP_NAME_TAGS = (" [LFG]", " [LIVE]")
+CATEGORY_CHANNEL_LIMIT = 50  # Discord's cap on channels per category
+CATEGORY_HEADROOM = 2  # spill over this many channels before the cap
+DEFAULT_CREATE_BURST = 3  # Join-to-Create channels a user may create back to back...
+DEFAULT_CREATE_PER_SECONDS = 120  # ...refilled over this many seconds
+CREATE_BUCKET_TTL = 60 * 60  # forget idle buckets after this long
+
+# Background loops started by AutoVCCog instances, keyed by loop name. More than
+# one of each means a cog was constructed outside setup() and leaked its loop.
+RUNNING_LOOPS = Counter()
 
 def load_json(path):
     if not os.path.exists(path):
@@ -25,12 +51,73 @@ def save_json(path, data):
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=4)
 
+class RingBuffer:
+    """The most recent ``size`` samples of a metric, for percentile summaries."""
+
+    def __init__(self, size=METRIC_SAMPLES):
+        self.samples = deque(maxlen=size)
+
+    def add(self, value):
+        self.samples.append(value)
+
+    def percentiles(self, *ps):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return None
+        return [ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] for p in ps]
+
+    def describe(self, fmt="{:.0f}ms", scale=1000):
+        """Format p50 / p95 / p99, or ``n/a`` before the first sample."""
+        values = self.percentiles(50, 95, 99)
+        if values is None:
+            return "n/a"
+        return " / ".join(fmt.format(v * scale) for v in values)
+
+def get_autovc(client):
+    """Return the loaded AutoVCCog. Views and modals must use this instead of constructing a cog."""
+    return client.get_cog("AutoVCCog")
+
+def applies_at_text(apply_at):
+    """Reply suffix telling the user when a queued edit will land (``apply_at`` is a Unix time)."""
+    if apply_at - time.time() < 5:
+        return ""
+    return f" Discord limits channel renames, so this applies <t:{int(apply_at)}:R>."
+
 class AutoVCCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.vc_data = {}
+        self.temp_channels = {}  # channel_id -> {"guild_id", "owner", "created_at", "panel_message_id"}
+        self._pending_deletes = {}  # channel_id -> grace timer task
+        self.pools = {}  # guild_id -> [channel_id] of hidden pre-created channels
+        self._pool_last_used = {}  # guild_id -> monotonic time of the last hub join
+        self._refill_tasks = {}  # guild_id -> pool refill task
+        self._edit_queues = {}  # channel_id -> {"changes", "overwrites", "apply_at", "name", "name_at", "task"}
+        self._rename_history = {}  # channel_id -> monotonic times of the last RENAME_LIMIT renames
+        self._admission = {}  # guild_id -> semaphore bounding concurrent channel creation
+        self._admission_members = set()  # (guild_id, member_id) queued or being served
+        self.admission_waiting = Counter()  # guild_id -> members waiting for a slot
+        self.admission_waits = {}  # guild_id -> RingBuffer of queue wait times in seconds
+        # Latency (seconds) and channel lifetime metrics across all guilds, for /autovcstatus
+        self.metrics = {
+            name: RingBuffer()
+            for name in ("join_to_move", "create", "pool_edit", "move", "panel", "lifetime", "peak_occupancy", "open_channels")
+        }
+        self.peak_channels = 0  # most temp channels alive at once since startup
+        self._peak_occupancy = {}  # channel_id -> most members seen at once
+        self.overflow_categories = {}  # guild_id -> [category_id] auto-created for overflow
+        self.prefs = {}  # guild_id -> {str(user_id): [name or None, user_limit, locked, hidden]}
+        self.channel_members = {}  # channel_id -> {member_id: monotonic join time}, in join order
+        self._create_buckets = {}  # (guild_id, user_id) -> [tokens, monotonic time of last update]
+        self.throttled = Counter()  # guild_id -> hub joins refused by the create rate limit
+        self._category_reserved = Counter()  # category_id -> channel creations in flight
+        self._overflow_locks = {}  # guild_id -> lock serialising category choice
+        self._reconciled = asyncio.Event()  # set once the startup reconciliation has run
+        self._reconcile_task = None
         self.load_data()
-        self.monitor_empty_channels.start()
+        self._start_loop(self.monitor_empty_channels)
+
+        # Persistent control panel components
+        self.bot.add_dynamic_items(ChannelSettingsDropdown, ChannelPermissionsDropdown)
 
     def load_data(self):
         cfg = load_json(CONFIG_FILE)
@@ -38,29 +125,440 @@ class AutoVCCog(commands.Cog):
         for gid in cfg.keys():
             d.setdefault(gid, {}).setdefault("autovc", {})
         save_json(DATA_FILE, d)
-        self.vc_data = d
+
+        self.temp_channels = {}
+        for gid, gdata in d.items():
+            for channel_id, info in gdata.get("autovc", {}).items():
+                self.temp_channels[int(channel_id)] = {
+                    "guild_id": int(gid),
+                    "owner": info.get("owner"),
+                    "created_at": info.get("created_at"),
+                    "panel_message_id": info.get("panel_message_id")
+                }
+            if gdata.get("autovc_pool"):
+                self.pools[int(gid)] = list(gdata["autovc_pool"])
+            if gdata.get("autovc_overflow"):
+                self.overflow_categories[int(gid)] = list(gdata["autovc_overflow"])
+            if gdata.get("autovc_prefs"):
+                self.prefs[int(gid)] = gdata["autovc_prefs"]
+
+    def _persist_channels(self, channel_ids):
+        """Write the registry entries for ``channel_ids`` to the data file.
+
+        Channels no longer in the registry are removed from the file; every
+        other entry in the file is left untouched.
+        """
+        data = load_json(DATA_FILE)
+        for channel_id, guild_id in channel_ids:
+            autovc = data.setdefault(str(guild_id), {}).setdefault("autovc", {})
+            entry = self.temp_channels.get(channel_id)
+            if entry:
+                autovc[str(channel_id)] = {k: v for k, v in entry.items() if k != "guild_id"}
+            else:
+                autovc.pop(str(channel_id), None)
+        save_json(DATA_FILE, data)
+
+    def _persist_pool(self, guild_id):
+        data = load_json(DATA_FILE)
+        data.setdefault(str(guild_id), {})["autovc_pool"] = self.pools.get(guild_id, [])
+        save_json(DATA_FILE, data)
+
+    def _persist_overflow(self, guild_id):
+        data = load_json(DATA_FILE)
+        data.setdefault(str(guild_id), {})["autovc_overflow"] = self.overflow_categories.get(guild_id, [])
+        save_json(DATA_FILE, data)
+
+    def remember_prefs(self, vc):
+        """Store the owner's current name, limit, lock and visibility for their next channel."""
+        entry = self.temp_channels.get(vc.id)
+        if not entry or not entry["owner"]:
+            return
+        owner = vc.guild.get_member(entry["owner"])
+        name = vc.name
+        for tag in TEMP_NAME_TAGS:
+            name = name.replace(tag, "")
+        if owner and name == f"{owner.display_name}'s VC":
+            name = None  # default name follows display name changes
+        everyone = vc.overwrites_for(vc.guild.default_role)
+        prefs = [name, vc.user_limit, everyone.connect is False, everyone.view_channel is False]
+
+        table = self.prefs.setdefault(vc.guild.id, {})
+        if table.get(str(entry["owner"])) == prefs:
+            return
+        table[str(entry["owner"])] = prefs
+        data = load_json(DATA_FILE)
+        data.setdefault(str(vc.guild.id), {})["autovc_prefs"] = table
+        save_json(DATA_FILE, data)
+
+    def register_channel(self, channel, owner_id):
+        self.temp_channels[channel.id] = {
+            "guild_id": channel.guild.id,
+            "owner": owner_id,
+            "created_at": str(discord.utils.utcnow()),
+            "panel_message_id": None
+        }
+        self.peak_channels = max(self.peak_channels, len(self.temp_channels))
+        self.metrics["open_channels"].add(len(self.temp_channels))
+        self._persist_channels([(channel.id, channel.guild.id)])
+
+    def update_channel(self, channel_id, **fields):
+        entry = self.temp_channels.get(channel_id)
+        if entry:
+            entry.update(fields)
+            self._persist_channels([(channel_id, entry["guild_id"])])
+
+    def unregister_channels(self, channel_ids):
+        for cid in channel_ids:
+            self._rename_history.pop(cid, None)
+            self.channel_members.pop(cid, None)
+            self._peak_occupancy.pop(cid, None)
+            queue = self._edit_queues.pop(cid, None)
+            if queue and queue["task"]:
+                queue["task"].cancel()
+        removed = [(cid, self.temp_channels.pop(cid)["guild_id"]) for cid in channel_ids if cid in self.temp_channels]
+        if removed:
+            self.metrics["open_channels"].add(len(self.temp_channels))
+            self._persist_channels(removed)
+
+    def _start_loop(self, loop):
+        name = loop.coro.__name__
+        if RUNNING_LOOPS[name]:
+            log.warning("%s already has %d running instance(s); an AutoVCCog has leaked", name, RUNNING_LOOPS[name])
+        RUNNING_LOOPS[name] += 1
+        loop.start()
+
+    def cog_load(self):
+        """Called when the cog is loaded"""
+        self._reconcile_task = asyncio.create_task(self.reconcile())
 
     def cog_unload(self):
         self.monitor_empty_channels.cancel()
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
+        self.bot.remove_dynamic_items(ChannelSettingsDropdown, ChannelPermissionsDropdown)
+        for task in self._pending_deletes.values():
+            task.cancel()
+        self._pending_deletes.clear()
+        for task in self._refill_tasks.values():
+            task.cancel()
+        self._refill_tasks.clear()
+        for queue in self._edit_queues.values():
+            if queue["task"]:
+                queue["task"].cancel()
+        self._edit_queues.clear()
 
-    @tasks.loop(seconds=10)
-    async def monitor_empty_channels(self):
+    def is_temp_channel(self, channel_id):
+        return channel_id in self.temp_channels
+
+    def _record_rename(self, channel_id):
+        self._rename_history.setdefault(channel_id, deque(maxlen=RENAME_LIMIT)).append(time.monotonic())
+
+    def next_rename_at(self, channel_id):
+        """Monotonic time at which ``channel_id`` can be renamed without hitting the rate limit."""
+        history = self._rename_history.get(channel_id)
+        if not history or len(history) < RENAME_LIMIT:
+            return 0
+        return history[0] + RENAME_WINDOW_SECONDS
+
+    def pending_name(self, vc):
+        """The name ``vc`` will have once queued edits are applied."""
+        queue = self._edit_queues.get(vc.id)
+        if queue and queue["name"] is not None:
+            return queue["name"]
+        return vc.name
+
+    def queue_edit(self, vc, overwrites=None, remember=True, **changes):
+        """Merge ``changes`` into the channel's pending edit and return the Unix time it applies.
+
+        ``overwrites`` maps a role or member to permission values to set on top of
+        the channel's current overwrites. Overwrite and limit changes are sent once
+        the debounce window has passed; a new name is held separately until the
+        rename rate limit allows it, so locking or hiding never waits on a rename.
+        Pass ``remember=False`` for edits the owner did not make themselves, so
+        they are not saved as the owner's preferences.
+        """
+        queue = self._edit_queues.setdefault(vc.id, {
+            "changes": {}, "overwrites": {}, "apply_at": 0, "remember": False,
+            "name": None, "name_at": 0, "task": None
+        })
+        now = time.monotonic()
+        debounced = now + EDIT_DEBOUNCE_SECONDS
+
+        name = changes.pop("name", None)
+        if name is not None:
+            # Toggling back before it was applied cancels the rename
+            queue["name"] = None if name == vc.name else name
+            queue["name_at"] = max(debounced, self.next_rename_at(vc.id))
+        if changes or overwrites:
+            queue["changes"].update(changes)
+            for target, perms in overwrites.items() if overwrites else ():
+                queue["overwrites"].setdefault(target, {}).update(perms)
+            queue["apply_at"] = debounced
+            queue["remember"] = queue["remember"] or remember
+
+        if queue["task"] is None or queue["task"].done():
+            queue["task"] = asyncio.create_task(self._apply_queued_edit(vc))
+        apply_at = queue["name_at"] if name is not None else debounced
+        return time.time() + (apply_at - now)
+
+    async def _apply_queued_edit(self, vc):
+        channel_id = vc.id
         try:
-            data = load_json(DATA_FILE)
-            to_delete = []
-            
-            for gid, gdata in data.items():
-                guild = self.bot.get_guild(int(gid))
-                if not guild:
+            while True:
+                queue = self._edit_queues.get(channel_id)
+                if queue is None:
+                    return
+                has_changes = bool(queue["changes"] or queue["overwrites"])
+                due = [at for at, pending in ((queue["apply_at"], has_changes), (queue["name_at"], queue["name"] is not None)) if pending]
+                if not due:
+                    self._edit_queues.pop(channel_id, None)
+                    return
+                delay = min(due) - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
                     continue
-                    
-                vc_data = gdata.get("autovc", {})
-                for channel_id, info in vc_data.items():
-                    channel = guild.get_channel(int(channel_id))
-                    if channel and isinstance(channel, discord.VoiceChannel):
-                        if len(channel.members) == 0:
-                            to_delete.append((guild, int(channel_id)))
-            
+
+                # Take whatever is due now; a rename still rate limited stays queued
+                now = time.monotonic()
+                kwargs = {}
+                overwrite_changes = {}
+                remember = False
+                if has_changes and queue["apply_at"] <= now:
+                    kwargs.update(queue["changes"])
+                    overwrite_changes = queue["overwrites"]
+                    remember = queue["remember"]
+                    queue["changes"], queue["overwrites"], queue["remember"] = {}, {}, False
+                if queue["name"] is not None and queue["name_at"] <= now:
+                    kwargs["name"] = queue["name"]
+                    queue["name"] = None
+                    remember = True  # only the owner renames, from the control panel
+                await self._send_edit(vc.guild, channel_id, kwargs, overwrite_changes, remember)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.exception("Error applying queued VC edit")
+            self._edit_queues.pop(channel_id, None)
+
+    async def _send_edit(self, guild, channel_id, kwargs, overwrite_changes, remember):
+        vc = guild.get_channel(channel_id)
+        if vc is None:
+            return
+        if kwargs.get("name") == vc.name:
+            del kwargs["name"]
+        if overwrite_changes:
+            overwrites = dict(vc.overwrites)
+            for target, perms in overwrite_changes.items():
+                overwrite = overwrites.get(target, discord.PermissionOverwrite())
+                overwrite.update(**perms)
+                overwrites[target] = overwrite
+            kwargs["overwrites"] = overwrites
+        if not kwargs:
+            return
+
+        try:
+            vc = await vc.edit(**kwargs) or vc
+        except discord.HTTPException as e:
+            log.warning(f"Failed to apply queued edit to VC {channel_id}: {e}")
+            return
+        if "name" in kwargs:
+            self._record_rename(vc.id)
+        if remember:
+            self.remember_prefs(vc)
+        await self.update_status_embed(vc)
+
+    def schedule_empty_check(self, channel):
+        """Delete ``channel`` after a grace period unless someone joins it again."""
+        if channel.id not in self._pending_deletes:
+            self._pending_deletes[channel.id] = asyncio.create_task(self._delete_when_empty(channel))
+
+    def cancel_empty_check(self, channel_id):
+        task = self._pending_deletes.pop(channel_id, None)
+        if task:
+            task.cancel()
+
+    async def _delete_when_empty(self, channel):
+        try:
+            await asyncio.sleep(EMPTY_CHANNEL_GRACE_SECONDS)
+        except asyncio.CancelledError:
+            return
+        self._pending_deletes.pop(channel.id, None)
+        channel = channel.guild.get_channel(channel.id)
+        if channel and len(channel.members) == 0:
+            await self.delete_temp_channels([(channel.guild, channel.id)])
+
+    @staticmethod
+    def _looks_like_temp_channel(channel):
+        """Whether an unrecorded channel resembles an AutoVC temp channel (owner overwrite or default name)."""
+        owner_overwrite = discord.PermissionOverwrite(view_channel=True, connect=True)
+        if any(isinstance(target, discord.Member) and overwrite == owner_overwrite for target, overwrite in channel.overwrites.items()):
+            return True
+        name = channel.name
+        for tag in TEMP_NAME_TAGS:
+            name = name.replace(tag, "")
+        return name.endswith("'s VC")
+
+    async def reconcile(self):
+        """Bring the registry in line with Discord once, before voice events are handled.
+
+        Walks the cached channels of every guild: recorded channels that no longer
+        exist are forgotten and empty recorded channels are deleted. Only the
+        registry and the pool count as proof a channel is ours; unrecorded channels
+        that merely look like temp channels are reported, never touched, since
+        staff may have made them by hand.
+        """
+        await self.bot.wait_until_ready()
+        try:
+            cfg = load_json(CONFIG_FILE)
+            forgotten, to_delete, lookalikes = [], [], []
+
+            for guild in self.bot.guilds:
+                for channel_id, info in list(self.temp_channels.items()):
+                    if info["guild_id"] != guild.id:
+                        continue
+                    channel = guild.get_channel(channel_id)
+                    if channel is None:
+                        forgotten.append(channel_id)
+                    elif not channel.members:
+                        to_delete.append(channel)
+
+                pool = self.pools.get(guild.id)
+                if pool:
+                    pool[:] = [cid for cid in pool if guild.get_channel(cid)]
+                    self._persist_pool(guild.id)
+
+                guild_cfg = cfg.get(str(guild.id), {})
+                hub = guild.get_channel(guild_cfg.get("join_vc_id") or 0)
+                if not hub or not hub.category:
+                    continue
+                for category in self.autovc_categories(guild, hub.category, guild_cfg):
+                    for channel in category.voice_channels:
+                        if channel.id == hub.id or channel.id in self.temp_channels or channel.id in (pool or ()):
+                            continue
+                        if self._looks_like_temp_channel(channel):
+                            lookalikes.append(channel)
+
+            # Seed the membership index and hand over channels whose owner left while we were down
+            now = time.monotonic()
+            for channel_id, info in list(self.temp_channels.items()):
+                guild = self.bot.get_guild(info["guild_id"])
+                channel = guild.get_channel(channel_id) if guild else None
+                if channel is None or not channel.members:
+                    continue
+                self.channel_members[channel_id] = dict.fromkeys((m.id for m in channel.members), now)
+                if info["owner"] not in self.channel_members[channel_id]:
+                    self.transfer_ownership(channel)
+
+            semaphore = asyncio.Semaphore(RECONCILE_CONCURRENCY)
+
+            async def delete(channel):
+                async with semaphore:
+                    try:
+                        await channel.delete()
+                    except discord.NotFound:
+                        pass
+                    except discord.HTTPException as e:
+                        log.warning(f"Could not delete orphaned VC {channel.id}: {e}")
+
+            await asyncio.gather(*(delete(channel) for channel in to_delete))
+            self.unregister_channels(forgotten + [channel.id for channel in to_delete])
+            deleted_ids = {channel.id for channel in to_delete}
+            for guild in self.bot.guilds:
+                await self.cleanup_overflow_categories(guild, deleted_ids)
+            log.info(f"AutoVC reconciled: {len(to_delete)} deleted, {len(forgotten)} forgotten")
+            if lookalikes:
+                log.warning(
+                    "Left %d unrecorded channel(s) that look like AutoVC channels for staff to review: %s",
+                    len(lookalikes), ", ".join(f"{c.name} ({c.id})" for c in lookalikes)
+                )
+        except Exception:
+            log.exception("Error reconciling AutoVC channels")
+        finally:
+            self._reconciled.set()
+
+    def autovc_categories(self, guild, primary, guild_cfg):
+        """The hub's category followed by configured and auto-created overflow categories."""
+        categories = [primary]
+        for category_id in guild_cfg.get("autovc_overflow_categories", []) + self.overflow_categories.get(guild.id, []):
+            category = guild.get_channel(category_id)
+            if isinstance(category, discord.CategoryChannel) and category not in categories:
+                categories.append(category)
+        return categories
+
+    async def reserve_category(self, guild, primary, guild_cfg):
+        """Pick a category with room for one more channel and reserve a slot in it.
+
+        Counts come from the channel cache plus creations still in flight, so
+        concurrent joins do not all pick the same nearly full category. The
+        caller must decrement ``_category_reserved`` once the channel exists.
+        """
+        lock = self._overflow_locks.setdefault(guild.id, asyncio.Lock())
+        async with lock:
+            for category in self.autovc_categories(guild, primary, guild_cfg):
+                if len(category.channels) + self._category_reserved[category.id] < CATEGORY_CHANNEL_LIMIT - CATEGORY_HEADROOM:
+                    break
+            else:
+                auto = self.overflow_categories.setdefault(guild.id, [])
+                category = await guild.create_category(
+                    f"{primary.name} (overflow {len(auto) + 1})",
+                    overwrites=primary.overwrites,
+                    position=primary.position + 1
+                )
+                auto.append(category.id)
+                self._persist_overflow(guild.id)
+                log.info(f"Created AutoVC overflow category {category.name} in guild {guild.id}")
+            self._category_reserved[category.id] += 1
+            return category
+
+    async def cleanup_overflow_categories(self, guild, deleted_ids=()):
+        """Delete auto-created overflow categories that no longer hold any channel."""
+        auto = self.overflow_categories.get(guild.id)
+        if not auto:
+            return
+        for category_id in list(auto):
+            category = guild.get_channel(category_id)
+            if category is not None:
+                if self._category_reserved[category_id] or any(c.id not in deleted_ids for c in category.channels):
+                    continue
+                try:
+                    await category.delete()
+                except discord.NotFound:
+                    pass
+                except discord.HTTPException as e:
+                    log.warning(f"Could not delete overflow category {category_id}: {e}")
+                    continue
+            auto.remove(category_id)
+        self._persist_overflow(guild.id)
+
+    def transfer_ownership(self, vc):
+        """Hand ``vc`` to its longest-present member, or return None if it is empty.
+
+        The owner overwrite moves with the channel through the edit queue, so it is
+        sent together with any other pending change and the panel is refreshed
+        once the edit lands.
+        """
+        members = self.channel_members.get(vc.id)
+        entry = self.temp_channels.get(vc.id)
+        if not members or not entry:
+            return None
+        old_owner_id = entry["owner"]
+        new_owner_id = next(iter(members))
+        self.update_channel(vc.id, owner=new_owner_id)
+
+        overwrites = {}
+        old_owner = vc.guild.get_member(old_owner_id) if old_owner_id else None
+        if old_owner:
+            overwrites[old_owner] = {"view_channel": None, "connect": None}
+        new_owner = vc.guild.get_member(new_owner_id)
+        if new_owner:
+            overwrites[new_owner] = {"view_channel": True, "connect": True}
+        # Not the new owner's doing, so don't save the old owner's setup as their preferences
+        self.queue_edit(vc, overwrites=overwrites, remember=False)
+        log.info(f"Transferred VC {vc.id} from {old_owner_id} to {new_owner_id}")
+        return new_owner_id
+
+    async def delete_temp_channels(self, to_delete):
+        """Delete ``(guild, channel_id)`` pairs and drop them from the registry."""
+        try:
             for guild, channel_id in to_delete:
                 channel = guild.get_channel(channel_id)
                 if channel:
@@ -69,75 +567,327 @@ class AutoVCCog(commands.Cog):
                         log.info(f"Deleted empty VC: {channel.name}")
                     except discord.NotFound:
                         pass
+
+            now = discord.utils.utcnow()
+            for _, channel_id in to_delete:
+                entry = self.temp_channels.get(channel_id)
+                if entry and entry.get("created_at"):
+                    self.metrics["lifetime"].add((now - datetime.fromisoformat(entry["created_at"])).total_seconds())
+                if channel_id in self._peak_occupancy:
+                    self.metrics["peak_occupancy"].add(self._peak_occupancy[channel_id])
+            self.unregister_channels([channel_id for _, channel_id in to_delete])
+
+            deleted_ids = {channel_id for _, channel_id in to_delete}
+            for guild in {guild for guild, _ in to_delete}:
+                await self.cleanup_overflow_categories(guild, deleted_ids)
+        except Exception:
+            log.exception("Error deleting empty channels")
+
+    def refill_pool(self, guild, category, size):
+        """Top the guild's warm pool up to ``size`` in the background."""
+        task = self._refill_tasks.get(guild.id)
+        if task and not task.done():
+            return
+        self._refill_tasks[guild.id] = asyncio.create_task(self._refill_pool(guild, category, size))
+
+    async def _refill_pool(self, guild, category, size):
+        pool = self.pools.setdefault(guild.id, [])
+        try:
+            while len(pool) < size:
+                overwrites = dict(category.overwrites)
+                overwrites[guild.default_role] = discord.PermissionOverwrite(view_channel=False, connect=False)
+                channel = await category.create_voice_channel(name=POOL_CHANNEL_NAME, overwrites=overwrites)
+                pool.append(channel.id)
+                self._persist_pool(guild.id)
+        except discord.HTTPException as e:
+            log.warning(f"Could not refill AutoVC pool in guild {guild.id}: {e}")
+        except Exception:
+            log.exception("Error refilling AutoVC pool")
+
+    async def shrink_pool(self, guild, size):
+        pool = self.pools.get(guild.id, [])
+        excess = pool[size:]
+        if not excess:
+            return
+        del pool[size:]
+        self._persist_pool(guild.id)
+        for channel_id in excess:
+            channel = guild.get_channel(channel_id)
+            if channel:
+                try:
+                    await channel.delete()
+                except discord.NotFound:
+                    pass
+
+    async def take_pooled_channel(self, guild, name, user_limit, overwrites):
+        """Reveal a pooled channel as ``name`` with a single edit, or return None."""
+        pool = self.pools.get(guild.id)
+        while pool:
+            channel = guild.get_channel(pool.pop(0))
+            self._persist_pool(guild.id)
+            if channel is None:
+                continue
+            try:
+                start = time.monotonic()
+                await channel.edit(name=name, user_limit=user_limit, overwrites=overwrites)
+                self.metrics["pool_edit"].add(time.monotonic() - start)
+                self._record_rename(channel.id)
+                return channel
+            except discord.HTTPException as e:
+                log.warning(f"Could not use pooled channel {channel.id}: {e}")
+                # It is already out of the pool and not registered, so nothing else would clean it up
+                try:
+                    await channel.delete()
+                except discord.NotFound:
+                    pass
+                except discord.HTTPException:
+                    # Hand it back to the pool so shrink_pool or the reconciler can retry
+                    pool.append(channel.id)
+                    self._persist_pool(guild.id)
+                    return None
+        return None
+
+    async def maintain_pools(self):
+        """Refill configured pools and shrink the ones that have gone idle."""
+        cfg = load_json(CONFIG_FILE)
+        now = time.monotonic()
+        guild_ids = set(self.pools) | {int(gid) for gid, gcfg in cfg.items() if isinstance(gcfg, dict) and gcfg.get("autovc_pool_size")}
+        for guild_id in guild_ids:
+            guild = self.bot.get_guild(guild_id)
+            if not guild:
+                continue
+            guild_cfg = cfg.get(str(guild_id), {})
+            size = guild_cfg.get("autovc_pool_size", 0)
+            if now - self._pool_last_used.get(guild_id, 0) > POOL_IDLE_SECONDS:
+                size = min(size, POOL_IDLE_SIZE)
+            if len(self.pools.get(guild_id, [])) > size:
+                await self.shrink_pool(guild, size)
+            elif size:
+                hub = guild.get_channel(guild_cfg.get("join_vc_id") or 0)
+                if hub and hub.category:
+                    self.refill_pool(guild, hub.category, size)
+
+    @tasks.loop(minutes=SWEEP_MINUTES)
+    async def monitor_empty_channels(self):
+        """Safety net for empty channels whose leave event was missed (e.g. during a reconnect)."""
+        try:
+            to_delete = []
+            
+            for channel_id, info in list(self.temp_channels.items()):
+                if channel_id in self._pending_deletes:
+                    continue
+                guild = self.bot.get_guild(info["guild_id"])
+                if not guild:
+                    continue
+                channel = guild.get_channel(channel_id)
+                if channel is None:
+                    # Deleted behind our back; only the registry entry is left
+                    to_delete.append((guild, channel_id))
+                elif isinstance(channel, discord.VoiceChannel) and len(channel.members) == 0:
+                    to_delete.append((guild, channel_id))
             
-            # Clean up data
             if to_delete:
-                data = load_json(DATA_FILE)
-                for guild, channel_id in to_delete:
-                    str_gid = str(guild.id)
-                    if str_gid in data and "autovc" in data[str_gid]:
-                        data[str_gid]["autovc"].pop(str(channel_id), None)
-                save_json(DATA_FILE, data)
-                self.vc_data = data
+                await self.delete_temp_channels(to_delete)
+
+            await self.maintain_pools()
+            self.prune_create_buckets()
                 
         except Exception as e:
             log.exception("Error monitoring empty channels")
 
+    @monitor_empty_channels.before_loop
+    async def before_monitor(self):
+        await self.bot.wait_until_ready()
+        await self._reconciled.wait()
+
+    @monitor_empty_channels.after_loop
+    async def after_monitor(self):
+        RUNNING_LOOPS["monitor_empty_channels"] -= 1
+
     @commands.Cog.listener()
     async def on_voice_state_update(self, member, before, after):
+        await self._reconciled.wait()
+        if before.channel != after.channel:
+            if after.channel and self.is_temp_channel(after.channel.id):
+                self.channel_members.setdefault(after.channel.id, {}).setdefault(member.id, time.monotonic())
+                occupancy = len(after.channel.members)
+                if occupancy > self._peak_occupancy.get(after.channel.id, 0):
+                    self._peak_occupancy[after.channel.id] = occupancy
+                if after.channel.id in self._pending_deletes:
+                    self.cancel_empty_check(after.channel.id)
+            if before.channel and self.is_temp_channel(before.channel.id):
+                members = self.channel_members.get(before.channel.id, {})
+                members.pop(member.id, None)
+                if len(before.channel.members) == 0:
+                    self.schedule_empty_check(before.channel)
+                elif member.id == self.temp_channels[before.channel.id]["owner"]:
+                    self.transfer_ownership(before.channel)
+
         try:
             cfg = load_json(CONFIG_FILE)
             guild_cfg = cfg.get(str(member.guild.id), {})
             join_vc_id = guild_cfg.get("join_vc_id")
             
-            if join_vc_id and after.channel and after.channel.id == join_vc_id:
-                # Create voice channel with public permissions
-                category = after.channel.category
-                if not category:
-                    category = member.guild.categories[0] if member.guild.categories else None
-                
-                if not category:
+            if join_vc_id and after.channel and after.channel.id == join_vc_id and before.channel != after.channel:
+                if (member.guild.id, member.id) in self._admission_members:
                     return
-                
-                # Create voice channel with public permissions
-                user_vc = await category.create_voice_channel(
-                    name=f"{member.display_name}'s VC",
-                    user_limit=0
-                )
-                
-                # Ensure channel is public - everyone can see and join
-                everyone_role = member.guild.default_role
-                await user_vc.set_permissions(
-                    everyone_role,
-                    view_channel=True,
-                    connect=True,
-                    speak=True,
-                    stream=True
-                )
-                
-                # Move user to new channel
-                await member.move_to(user_vc)
-                
-                # Store channel info
-                data = load_json(DATA_FILE)
-                data.setdefault(str(member.guild.id), {}).setdefault("autovc", {})[str(user_vc.id)] = {
-                    "owner": member.id,
-                    "created_at": str(discord.utils.utcnow())
-                }
-                save_json(DATA_FILE, data)
-                self.vc_data = data
-                
-                # Send control panel
-                await self.send_control_panel(user_vc, member)
+                retry_after = self.take_create_token(member, guild_cfg)
+                if retry_after:
+                    await self.throttle(member, retry_after)
+                    return
+                await self.admit(member, after.channel, guild_cfg, time.monotonic())
                 
         except Exception as e:
             log.exception("Error creating VC")
 
+    def take_create_token(self, member, guild_cfg):
+        """Spend one of the member's channel-create tokens.
+
+        Returns 0 if a token was available, otherwise the seconds until the next one.
+        """
+        rate = guild_cfg.get("autovc_rate", {})
+        burst = rate.get("burst", DEFAULT_CREATE_BURST)
+        per_seconds = rate.get("per_seconds", DEFAULT_CREATE_PER_SECONDS)
+        refill_rate = burst / per_seconds
+
+        key = (member.guild.id, member.id)
+        now = time.monotonic()
+        tokens, updated = self._create_buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * refill_rate)
+        if tokens < 1:
+            self._create_buckets[key] = [tokens, now]
+            return (1 - tokens) / refill_rate
+        self._create_buckets[key] = [tokens - 1, now]
+        return 0
+
+    def prune_create_buckets(self):
+        cutoff = time.monotonic() - CREATE_BUCKET_TTL
+        for key, (_, updated) in list(self._create_buckets.items()):
+            if updated < cutoff:
+                del self._create_buckets[key]
+
+    async def throttle(self, member, retry_after):
+        """Handle a hub join over the rate limit without creating anything."""
+        self.throttled[member.guild.id] += 1
+        for channel_id, info in self.temp_channels.items():
+            if info["owner"] == member.id and info["guild_id"] == member.guild.id:
+                existing = member.guild.get_channel(channel_id)
+                if existing:
+                    try:
+                        await member.move_to(existing)
+                        return
+                    except discord.HTTPException:
+                        break
+        try:
+            await member.send(
+                f"⏳ You're creating voice channels too quickly in **{member.guild.name}**. "
+                f"Try again <t:{int(time.time() + retry_after)}:R>."
+            )
+        except discord.HTTPException:
+            pass
+
+    async def timed(self, metric, coro):
+        """Await ``coro``, recording how long it took under ``metric``."""
+        start = time.monotonic()
+        try:
+            return await coro
+        finally:
+            self.metrics[metric].add(time.monotonic() - start)
+
+    async def admit(self, member, hub, guild_cfg, joined_at):
+        """Queue a hub join behind the guild's creation slots.
+
+        A member who is already queued is not queued again, so bouncing in and
+        out of the hub yields one channel. Members who leave the hub while
+        waiting are dropped when their turn comes.
+        """
+        key = (member.guild.id, member.id)
+        if key in self._admission_members:
+            return
+        self._admission_members.add(key)
+        semaphore = self._admission.setdefault(member.guild.id, asyncio.Semaphore(ADMISSION_CONCURRENCY))
+        queued_at = time.monotonic()
+        waiting = True
+        self.admission_waiting[member.guild.id] += 1
+        try:
+            async with semaphore:
+                self.admission_waiting[member.guild.id] -= 1
+                waiting = False
+                self.admission_waits.setdefault(member.guild.id, RingBuffer()).add(time.monotonic() - queued_at)
+                if member.voice is None or member.voice.channel != hub:
+                    return
+                if await self.create_temp_channel(member, hub, guild_cfg):
+                    self.metrics["join_to_move"].add(time.monotonic() - joined_at)
+        finally:
+            if waiting:
+                self.admission_waiting[member.guild.id] -= 1
+            self._admission_members.discard(key)
+
+    async def create_temp_channel(self, member, hub, guild_cfg):
+        """Give ``member`` a channel of their own and move them in. Returns True once moved."""
+        # Create voice channel with public permissions
+        category = hub.category
+        if not category:
+            category = member.guild.categories[0] if member.guild.categories else None
+        
+        if not category:
+            return False
+        
+        # Apply the owner's remembered settings up front so they cost no extra edits
+        prefs = self.prefs.get(member.guild.id, {}).get(str(member.id))
+        pref_name, user_limit, locked, hidden = prefs or (None, 0, False, False)
+
+        # Passing overwrites skips the category sync, so start from the category's own
+        overwrites = dict(category.overwrites)
+        overwrites[member.guild.default_role] = discord.PermissionOverwrite(
+            view_channel=not hidden,
+            connect=not locked,
+            speak=True,
+            stream=True
+        )
+        # The owner keeps access even after locking or hiding the channel
+        overwrites[member] = discord.PermissionOverwrite(view_channel=True, connect=True)
+        name = pref_name or f"{member.display_name}'s VC"
+
+        # Reveal a warm pooled channel if there is one, otherwise create it in a single call
+        pool_size = guild_cfg.get("autovc_pool_size", 0)
+        self._pool_last_used[member.guild.id] = time.monotonic()
+        user_vc = await self.take_pooled_channel(member.guild, name, user_limit, overwrites)
+        if user_vc is None:
+            # Spill into an overflow category once the hub's category is nearly full
+            target = await self.reserve_category(member.guild, category, guild_cfg)
+            try:
+                user_vc = await self.timed("create", target.create_voice_channel(
+                    name=name,
+                    user_limit=user_limit,
+                    overwrites=overwrites
+                ))
+            finally:
+                self._category_reserved[target.id] -= 1
+        if pool_size:
+            self.refill_pool(member.guild, category, pool_size)
+        
+        # Store channel info
+        self.register_channel(user_vc, member.id)
+        
+        # Move user and send the control panel concurrently
+        moved, _ = await asyncio.gather(
+            self.timed("move", member.move_to(user_vc)),
+            self.timed("panel", self.send_control_panel(user_vc, member)),
+            return_exceptions=True
+        )
+        if isinstance(moved, Exception):
+            log.warning(f"Could not move {member} into {user_vc.name}: {moved}")
+            self.schedule_empty_check(user_vc)
+            return False
+        return True
+
     async def send_control_panel(self, vc, owner):
         try:
             embed = await self.create_status_embed(vc)
-            view = VCControlView(vc, owner)
-            await vc.send(embed=embed, view=view)
+            view = VCControlView(vc.id)
+            message = await vc.send(embed=embed, view=view)
+            self.update_channel(vc.id, panel_message_id=message.id)
         except Exception as e:
             log.exception("Error sending control panel")
 
@@ -155,12 +905,15 @@ class AutoVCCog(commands.Cog):
 
         # Count current members
         member_count = len(vc.members)
+        entry = self.temp_channels.get(vc.id)
+        owner_text = f"<@{entry['owner']}>" if entry and entry["owner"] else "`Unknown`"
         
         embed = discord.Embed(
             title="🎙️ Voice Channel Control Panel",
             description=(
                 "ℹ️ This channel will be deleted automatically when empty.\n\n"
                 "**📊 Current Channel Status:**\n"
+                f"├ **👑 Owner:** {owner_text}\n"
                 f"├ **👥 Members:** `{member_count}`\n"
                 f"├ **📝 Name:** `{vc.name}`\n"
                 f"├ **🚪 User Limit:** `{vc.user_limit if vc.user_limit > 0 else 'Unlimited'}`\n"
@@ -186,27 +939,180 @@ class AutoVCCog(commands.Cog):
     async def update_status_embed(self, vc):
         """Update the status embed in the channel"""
         try:
-            # Find the control panel message
+            embed = await self.create_status_embed(vc)
+            entry = self.temp_channels.get(vc.id)
+            message_id = entry.get("panel_message_id") if entry else None
+            if message_id:
+                try:
+                    await vc.get_partial_message(message_id).edit(embed=embed)
+                    return
+                except discord.NotFound:
+                    log.debug(f"Control panel {message_id} in {vc.id} is gone, searching history")
+
+            # Fallback for panels sent before their ID was recorded
             async for message in vc.history(limit=10):
                 if message.embeds and message.author == self.bot.user:
-                    embed = await self.create_status_embed(vc)
                     await message.edit(embed=embed)
+                    self.update_channel(vc.id, panel_message_id=message.id)
                     break
         except Exception as e:
             log.debug(f"Could not update status embed: {e}")
 
+    # Admin Commands
+    @app_commands.command(name="setjoinvc", description="Set the voice channel to trigger auto VC creation")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def set_join_vc(self, interaction: discord.Interaction, channel: discord.VoiceChannel):
+        cfg = load_json(CONFIG_FILE)
+        cfg.setdefault(str(interaction.guild_id), {})["join_vc_id"] = channel.id
+        save_json(CONFIG_FILE, cfg)
+        await interaction.response.send_message(f"✅ Auto VC will trigger from {channel.mention}", ephemeral=True)
+
+    @app_commands.command(name="setautovcpool", description="Keep pre-created hidden channels ready for Join-to-Create")
+    @app_commands.describe(size=f"Number of warm channels to keep (0-{POOL_MAX_SIZE}, 0 = disabled)")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def set_autovc_pool(self, interaction: discord.Interaction, size: app_commands.Range[int, 0, POOL_MAX_SIZE]):
+        cfg = load_json(CONFIG_FILE)
+        guild_cfg = cfg.setdefault(str(interaction.guild_id), {})
+        guild_cfg["autovc_pool_size"] = size
+        save_json(CONFIG_FILE, cfg)
+
+        message = f"✅ AutoVC will keep `{size}` warm channel(s) ready." if size else "✅ AutoVC warm pool disabled."
+        await interaction.response.send_message(message, ephemeral=True)
+
+        if len(self.pools.get(interaction.guild_id, [])) > size:
+            await self.shrink_pool(interaction.guild, size)
+        elif size:
+            hub = interaction.guild.get_channel(guild_cfg.get("join_vc_id") or 0)
+            if hub and hub.category:
+                self._pool_last_used[interaction.guild_id] = time.monotonic()
+                self.refill_pool(interaction.guild, hub.category, size)
+
+    @app_commands.command(name="autovcoverflow", description="Add or remove a category AutoVC spills into when the hub's category is full")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def autovc_overflow(self, interaction: discord.Interaction, action: Literal["add", "remove"], category: discord.CategoryChannel):
+        cfg = load_json(CONFIG_FILE)
+        overflow = cfg.setdefault(str(interaction.guild_id), {}).setdefault("autovc_overflow_categories", [])
+        if action == "add" and category.id not in overflow:
+            overflow.append(category.id)
+        elif action == "remove" and category.id in overflow:
+            overflow.remove(category.id)
+        save_json(CONFIG_FILE, cfg)
+
+        verb = "will now spill into" if action == "add" else "will no longer use"
+        await interaction.response.send_message(f"✅ AutoVC {verb} **{category.name}**.", ephemeral=True)
+
+    @app_commands.command(name="setautovcratelimit", description="Limit how many channels a user can create from the Join-to-Create hub")
+    @app_commands.describe(burst="Channels a user may create back to back", per_seconds="Seconds to earn the full burst back")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def set_autovc_rate_limit(self, interaction: discord.Interaction, burst: app_commands.Range[int, 1, 20], per_seconds: app_commands.Range[int, 10, 3600]):
+        cfg = load_json(CONFIG_FILE)
+        cfg.setdefault(str(interaction.guild_id), {})["autovc_rate"] = {"burst": burst, "per_seconds": per_seconds}
+        save_json(CONFIG_FILE, cfg)
+        await interaction.response.send_message(f"✅ Users can create `{burst}` channel(s) per `{per_seconds}s`.", ephemeral=True)
+
+    @app_commands.command(name="autovcstatus", description="Check AutoVC configuration status")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def autovc_status(self, interaction: discord.Interaction):
+        cfg = load_json(CONFIG_FILE)
+        guild_cfg = cfg.get(str(interaction.guild_id), {})
+        join_vc_id = guild_cfg.get("join_vc_id")
+        
+        if join_vc_id:
+            channel = interaction.guild.get_channel(join_vc_id)
+            channel_mention = channel.mention if channel else "Not found"
+        else:
+            channel_mention = "Not configured"
+        
+        embed = discord.Embed(
+            title="AutoVC Configuration Status",
+            description=f"**Join VC:** {channel_mention}",
+            color=discord.Color.from_str("#a700fa")
+        )
+        
+        # Count active channels
+        active_channels = sum(1 for info in self.temp_channels.values() if info["guild_id"] == interaction.guild_id)
+        
+        embed.add_field(name="Active AutoVC Channels", value=str(active_channels), inline=True)
+        waits = self.admission_waits.get(interaction.guild_id, RingBuffer())
+        embed.add_field(
+            name="Admission Queue",
+            value=f"{self.admission_waiting[interaction.guild_id]} waiting\nWait p50/p95/p99: `{waits.describe()}`",
+            inline=True
+        )
+        rate = guild_cfg.get("autovc_rate", {})
+        embed.add_field(
+            name="Create Rate Limit",
+            value=(
+                f"{rate.get('burst', DEFAULT_CREATE_BURST)} per {rate.get('per_seconds', DEFAULT_CREATE_PER_SECONDS)}s\n"
+                f"Throttled joins: `{self.throttled[interaction.guild_id]}`"
+            ),
+            inline=True
+        )
+        overflow_count = len(guild_cfg.get("autovc_overflow_categories", [])) + len(self.overflow_categories.get(interaction.guild_id, []))
+        embed.add_field(name="Overflow Categories", value=str(overflow_count), inline=True)
+        embed.add_field(
+            name="Warm Pool",
+            value=f"{len(self.pools.get(interaction.guild_id, []))}/{guild_cfg.get('autovc_pool_size', 0)}",
+            inline=True
+        )
+        metrics = self.metrics
+        embed.add_field(
+            name="Latency p50 / p95 / p99",
+            value=(
+                f"Join → moved: `{metrics['join_to_move'].describe()}`\n"
+                f"Create: `{metrics['create'].describe()}`\n"
+                f"Pool reveal: `{metrics['pool_edit'].describe()}`\n"
+                f"Move: `{metrics['move'].describe()}`\n"
+                f"Panel: `{metrics['panel'].describe()}`"
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name="Channel Usage",
+            value=(
+                f"Open now: `{len(self.temp_channels)}` (peak `{self.peak_channels}`)\n"
+                f"Open p50/p95/p99: `{metrics['open_channels'].describe('{:.0f}', 1)}`\n"
+                f"Lifetime p50/p95/p99: `{metrics['lifetime'].describe('{:.0f}s', 1)}`\n"
+                f"Peak members p50/p95/p99: `{metrics['peak_occupancy'].describe('{:.0f}', 1)}`"
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name="Background Loops",
+            value="\n".join(f"`{name}`: {count}" for name, count in RUNNING_LOOPS.items()) or "None",
+            inline=True
+        )
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def resolve_panel_channel(interaction: discord.Interaction, channel_id: int):
+    """Return ``(cog, vc)`` for a control panel if the user owns the channel, otherwise reply and return None."""
+    cog = get_autovc(interaction.client)
+    entry = cog.temp_channels.get(channel_id) if cog else None
+    vc = interaction.guild.get_channel(channel_id) if interaction.guild else None
+    if entry is None or vc is None:
+        await interaction.response.send_message("❌ This voice channel no longer exists.", ephemeral=True)
+        return None
+    if interaction.user.id != entry["owner"]:
+        await interaction.response.send_message("❌ Only the owner can edit this VC.", ephemeral=True)
+        return None
+    return cog, vc
+
 class VCControlView(discord.ui.View):
-    def __init__(self, voice_channel: discord.VoiceChannel, owner: discord.Member):
+    """Control panel for one temp channel.
+
+    The dropdowns are dynamic items whose custom IDs encode the channel, so the
+    classes registered once in AutoVCCog dispatch every panel, including panels
+    sent before a restart, and no view object is kept per channel.
+    """
+    def __init__(self, channel_id: int):
         super().__init__(timeout=None)
-        self.voice_channel = voice_channel
-        self.owner = owner
-        self.add_item(ChannelSettingsDropdown(voice_channel, owner))
-        self.add_item(ChannelPermissionsDropdown(voice_channel, owner))
+        self.add_item(ChannelSettingsDropdown(channel_id))
+        self.add_item(ChannelPermissionsDropdown(channel_id))
 
-class ChannelSettingsDropdown(discord.ui.Select):
-    def __init__(self, vc, owner):
-        self.vc = vc
-        self.owner = owner
+class ChannelSettingsDropdown(discord.ui.DynamicItem[discord.ui.Select], template=r"autovc:settings:(?P<channel_id>[0-9]+)"):
+    def __init__(self, channel_id: int):
+        self.channel_id = channel_id
         options = [
             discord.SelectOption(label="Name", emoji="📝", description="Change the channel name"),
             discord.SelectOption(label="Limit", emoji="👥", description="Change the user limit"),
@@ -214,80 +1120,85 @@ class ChannelSettingsDropdown(discord.ui.Select):
             discord.SelectOption(label="LFG", emoji="🎯", description="Toggle Looking for Game tag"),
             discord.SelectOption(label="LIVE", emoji="🎥", description="Toggle LIVE to let others know")
         ]
-        super().__init__(placeholder="⚙️ Channel Settings", options=options)
+        super().__init__(discord.ui.Select(
+            placeholder="⚙️ Channel Settings",
+            options=options,
+            custom_id=f"autovc:settings:{channel_id}"
+        ))
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Select, match):
+        return cls(int(match["channel_id"]))
 
     async def callback(self, interaction: discord.Interaction):
-        if interaction.user != self.owner:
-            return await interaction.response.send_message("❌ Only the owner can edit this VC.", ephemeral=True)
+        resolved = await resolve_panel_channel(interaction, self.channel_id)
+        if not resolved:
+            return
+        cog, vc = resolved
 
-        choice = self.values[0]
+        choice = self.item.values[0]
         
         if choice == "Name":
             try:
-                modal = NameModal(self.vc, self)
+                modal = NameModal(vc)
                 await interaction.response.send_modal(modal)
             except Exception as e:
                 await interaction.response.send_message(f"Error changing name: {e}", ephemeral=True)
 
         elif choice == "Limit":
             try:
-                modal = LimitModal(self.vc, self)
+                modal = LimitModal(vc)
                 await interaction.response.send_modal(modal)
             except Exception as e:
                 await interaction.response.send_message(f"Error setting limit: {e}", ephemeral=True)
 
         elif choice == "Status":
             try:
-                embed = await AutoVCCog(self.vc.guild.voice_client or interaction.client).create_status_embed(self.vc)
+                embed = await cog.create_status_embed(vc)
                 await interaction.response.send_message(embed=embed, ephemeral=True)
             except Exception as e:
                 await interaction.response.send_message(f"Error getting status: {e}", ephemeral=True)
 
         elif choice == "LFG":
             try:
-                if "[LFG]" in self.vc.name:
-                    new_name = self.vc.name.replace(" [LFG]", "")
+                current_name = cog.pending_name(vc)
+                if "[LFG]" in current_name:
+                    new_name = current_name.replace(" [LFG]", "")
                     status = "removed from"
                 else:
-                    new_name = f"{self.vc.name} [LFG]"
+                    new_name = f"{current_name} [LFG]"
                     status = "added to"
                 
-                await self.vc.edit(name=new_name)
-                
-                # Update the embed
-                cog = AutoVCCog(self.vc.guild.voice_client or interaction.client)
-                await cog.update_status_embed(self.vc)
+                # Queued so fast toggling is merged and never waits on the rename limit
+                apply_at = cog.queue_edit(vc, name=new_name)
                 
-                await interaction.response.send_message(f"✅ LFG tag {status} `{self.vc.name}`.", ephemeral=True)
+                await interaction.response.send_message(f"✅ LFG tag {status} `{new_name}`.{applies_at_text(apply_at)}", ephemeral=True)
                 
             except discord.HTTPException as e:
                 await interaction.response.send_message(f"❌ Failed to toggle LFG: {e.text}", ephemeral=True)
             
         elif choice == "LIVE":
             try:
-                if "[LIVE]" in self.vc.name:
-                    new_name = self.vc.name.replace(" [LIVE]", "")
+                current_name = cog.pending_name(vc)
+                if "[LIVE]" in current_name:
+                    new_name = current_name.replace(" [LIVE]", "")
                     status = "removed from"
                 else:
-                    new_name = f"{self.vc.name} [LIVE]"
+                    new_name = f"{current_name} [LIVE]"
                     status = "added to"
                 
-                await self.vc.edit(name=new_name)
+                # Queued so fast toggling is merged and never waits on the rename limit
+                apply_at = cog.queue_edit(vc, name=new_name)
                 
-                # Update the embed
-                cog = AutoVCCog(self.vc.guild.voice_client or interaction.client)
-                await cog.update_status_embed(self.vc)
-                
-                await interaction.response.send_message(f"✅ LIVE tag {status} `{self.vc.name}`.", ephemeral=True)
+                await interaction.response.send_message(f"✅ LIVE tag {status} `{new_name}`.{applies_at_text(apply_at)}", ephemeral=True)
                 
             except discord.HTTPException as e:
                 await interaction.response.send_message(f"❌ Failed to toggle LIVE: {e.text}", ephemeral=True)
 
 class NameModal(discord.ui.Modal, title="Change Channel Name"):
-    def __init__(self, vc, dropdown):
+    def __init__(self, vc):
         super().__init__()
         self.vc = vc
-        self.dropdown = dropdown
         self.name_input = discord.ui.TextInput(
             label="New Channel Name",
             placeholder="Enter new channel name...",
@@ -302,22 +1213,17 @@ class NameModal(discord.ui.Modal, title="Change Channel Name"):
             if not new_name:
                 return await interaction.response.send_message("❌ Channel name cannot be empty.", ephemeral=True)
             
-            await self.vc.edit(name=new_name)
-            
-            # Update the embed
-            cog = AutoVCCog(self.vc.guild.voice_client or interaction.client)
-            await cog.update_status_embed(self.vc)
+            apply_at = get_autovc(interaction.client).queue_edit(self.vc, name=new_name)
             
-            await interaction.response.send_message(f"✅ Channel name changed to `{new_name}`.", ephemeral=True)
+            await interaction.response.send_message(f"✅ Channel name changed to `{new_name}`.{applies_at_text(apply_at)}", ephemeral=True)
             
         except discord.HTTPException as e:
             await interaction.response.send_message(f"❌ Failed to change name: {e.text}", ephemeral=True)
 
 class LimitModal(discord.ui.Modal, title="Set User Limit"):
-    def __init__(self, vc, dropdown):
+    def __init__(self, vc):
         super().__init__()
         self.vc = vc
-        self.dropdown = dropdown
         self.limit_input = discord.ui.TextInput(
             label="User Limit (0-99, 0 = unlimited)",
             placeholder="Enter limit (0-99)",
@@ -332,24 +1238,19 @@ class LimitModal(discord.ui.Modal, title="Set User Limit"):
             if limit < 0 or limit > 99:
                 return await interaction.response.send_message("❌ Limit must be between 0-99.", ephemeral=True)
             
-            await self.vc.edit(user_limit=limit)
-            
-            # Update the embed
-            cog = AutoVCCog(self.vc.guild.voice_client or interaction.client)
-            await cog.update_status_embed(self.vc)
+            apply_at = get_autovc(interaction.client).queue_edit(self.vc, user_limit=limit)
             
             limit_text = "unlimited" if limit == 0 else str(limit)
-            await interaction.response.send_message(f"✅ User limit set to `{limit_text}`.", ephemeral=True)
+            await interaction.response.send_message(f"✅ User limit set to `{limit_text}`.{applies_at_text(apply_at)}", ephemeral=True)
             
         except ValueError:
             await interaction.response.send_message("❌ Please enter a valid number.", ephemeral=True)
         except discord.HTTPException as e:
             await interaction.response.send_message(f"❌ Failed to set limit: {e.text}", ephemeral=True)
 
-class ChannelPermissionsDropdown(discord.ui.Select):
-    def __init__(self, vc, owner):
-        self.vc = vc
-        self.owner = owner
+class ChannelPermissionsDropdown(discord.ui.DynamicItem[discord.ui.Select], template=r"autovc:perms:(?P<channel_id>[0-9]+)"):
+    def __init__(self, channel_id: int):
+        self.channel_id = channel_id
         options = [
             discord.SelectOption(label="Lock", emoji="🔒", description="Lock the channel"),
             discord.SelectOption(label="Unlock", emoji="🔓", description="Unlock the channel"),
@@ -359,38 +1260,40 @@ class ChannelPermissionsDropdown(discord.ui.Select):
             discord.SelectOption(label="Ghost", emoji="👻", description="Hide channel from list"),
             discord.SelectOption(label="Unghost", emoji="👁️", description="Make channel visible again")
         ]
-        super().__init__(placeholder="🔐 Channel Permissions", options=options)
+        super().__init__(discord.ui.Select(
+            placeholder="🔐 Channel Permissions",
+            options=options,
+            custom_id=f"autovc:perms:{channel_id}"
+        ))
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Select, match):
+        return cls(int(match["channel_id"]))
 
     async def callback(self, interaction: discord.Interaction):
-        if interaction.user != self.owner:
-            return await interaction.response.send_message("❌ Only the owner can edit this VC.", ephemeral=True)
+        resolved = await resolve_panel_channel(interaction, self.channel_id)
+        if not resolved:
+            return
+        cog, vc = resolved
 
-        choice = self.values[0]
+        choice = self.item.values[0]
         
         if choice == "Lock":
             try:
-                everyone_role = self.vc.guild.default_role
-                await self.vc.set_permissions(everyone_role, connect=False)
-                
-                # Update the embed
-                cog = AutoVCCog(self.vc.guild.voice_client or interaction.client)
-                await cog.update_status_embed(self.vc)
+                everyone_role = vc.guild.default_role
+                apply_at = cog.queue_edit(vc, overwrites={everyone_role: {"connect": False}})
                 
-                await interaction.response.send_message("✅ Channel locked.", ephemeral=True)
+                await interaction.response.send_message(f"✅ Channel locked.{applies_at_text(apply_at)}", ephemeral=True)
                 
             except discord.HTTPException as e:
                 await interaction.response.send_message(f"❌ Failed to lock: {e.text}", ephemeral=True)
 
         elif choice == "Unlock":
             try:
-                everyone_role = self.vc.guild.default_role
-                await self.vc.set_permissions(everyone_role, connect=True)
+                everyone_role = vc.guild.default_role
+                apply_at = cog.queue_edit(vc, overwrites={everyone_role: {"connect": True}})
                 
-                # Update the embed
-                cog = AutoVCCog(self.vc.guild.voice_client or interaction.client)
-                await cog.update_status_embed(self.vc)
-                
-                await interaction.response.send_message("✅ Channel unlocked.", ephemeral=True)
+                await interaction.response.send_message(f"✅ Channel unlocked.{applies_at_text(apply_at)}", ephemeral=True)
                 
             except discord.HTTPException as e:
                 await interaction.response.send_message(f"❌ Failed to unlock: {e.text}", ephemeral=True)
@@ -421,7 +1324,7 @@ class ChannelPermissionsDropdown(discord.ui.Select):
 
         elif choice == "Invite":
             try:
-                invite_link = f"https://discord.gg/{self.vc.guild.id}"
+                invite_link = f"https://discord.gg/{vc.guild.id}"
                 await interaction.response.send_message(
                     f"📧 **Send this invite link:**\n```{invite_link}```",
                     ephemeral=True
@@ -431,28 +1334,20 @@ class ChannelPermissionsDropdown(discord.ui.Select):
 
         elif choice == "Ghost":
             try:
-                everyone_role = self.vc.guild.default_role
-                await self.vc.set_permissions(everyone_role, view_channel=False)
-                
-                # Update the embed
-                cog = AutoVCCog(self.vc.guild.voice_client or interaction.client)
-                await cog.update_status_embed(self.vc)
+                everyone_role = vc.guild.default_role
+                apply_at = cog.queue_edit(vc, overwrites={everyone_role: {"view_channel": False}})
                 
-                await interaction.response.send_message("✅ Channel hidden from list.", ephemeral=True)
+                await interaction.response.send_message(f"✅ Channel hidden from list.{applies_at_text(apply_at)}", ephemeral=True)
                 
             except discord.HTTPException as e:
                 await interaction.response.send_message(f"❌ Failed to hide: {e.text}", ephemeral=True)
 
         elif choice == "Unghost":
             try:
-                everyone_role = self.vc.guild.default_role
-                await self.vc.set_permissions(everyone_role, view_channel=True)
+                everyone_role = vc.guild.default_role
+                apply_at = cog.queue_edit(vc, overwrites={everyone_role: {"view_channel": True}})
                 
-                # Update the embed
-                cog = AutoVCCog(self.vc.guild.voice_client or interaction.client)
-                await cog.update_status_embed(self.vc)
-                
-                await interaction.response.send_message("✅ Channel made visible again.", ephemeral=True)
+                await interaction.response.send_message(f"✅ Channel made visible again.{applies_at_text(apply_at)}", ephemeral=True)
                 
             except discord.HTTPException as e:
                 await interaction.response.send_message(f"❌ Failed to unhide: {e.text}", ephemeral=True)
@@ -482,42 +1377,5 @@ class ChannelPermissionsDropdown(discord.ui.Select):
         else:
             await ctx.send("❌ You must be in a voice channel to use this command.")
 
-    # Admin Commands
-    @app_commands.command(name="setjoinvc", description="Set the voice channel to trigger auto VC creation")
-    @app_commands.checks.has_permissions(administrator=True)
-    async def set_join_vc(self, interaction: discord.Interaction, channel: discord.VoiceChannel):
-        cfg = load_json(CONFIG_FILE)
-        cfg.setdefault(str(interaction.guild_id), {})["join_vc_id"] = channel.id
-        save_json(CONFIG_FILE, cfg)
-        await interaction.response.send_message(f"✅ Auto VC will trigger from {channel.mention}", ephemeral=True)
-
-    @app_commands.command(name="autovcstatus", description="Check AutoVC configuration status")
-    @app_commands.checks.has_permissions(administrator=True)
-    async def autovc_status(self, interaction: discord.Interaction):
-        cfg = load_json(CONFIG_FILE)
-        guild_cfg = cfg.get(str(interaction.guild_id), {})
-        join_vc_id = guild_cfg.get("join_vc_id")
-        
-        if join_vc_id:
-            channel = interaction.guild.get_channel(join_vc_id)
-            channel_mention = channel.mention if channel else "Not found"
-        else:
-            channel_mention = "Not configured"
-        
-        embed = discord.Embed(
-            title="AutoVC Configuration Status",
-            description=f"**Join VC:** {channel_mention}",
-            color=discord.Color.from_str("#a700fa")
-        )
-        
-        # Count active channels
-        data = load_json(DATA_FILE)
-        guild_data = data.get(str(interaction.guild_id), {}).get("autovc", {})
-        active_channels = len(guild_data)
-        
-        embed.add_field(name="Active AutoVC Channels", value=str(active_channels), inline=True)
-        
-        await interaction.response.send_message(embed=embed, ephemeral=True)
-
 async def setup(bot: commands.Bot):
     await bot.add_cog(AutoVCCog(bot))
\ No newline at end of file
@@ -1,12 +1,25 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
+from collections import OrderedDict, namedtuple
+from typing import Literal, Optional, Union
+import asyncio
+import hashlib
 import json
 import os
+import time
 import logging
 
 log = logging.getLogger("modlog_cog")
 CONFIG_FILE = "server_config.json"
 
+# Attachment cache (opt-in per guild via /setattachmentcache)
+ATTACHMENT_CACHE_DIR = "attachment_cache"
+ATTACHMENT_CACHE_MAX_BYTES = 256 * 1024 * 1024  # hard cap for the whole cache on disk
+ATTACHMENT_MAX_BYTES = 8 * 1024 * 1024  # skip anything larger than a default upload
+ATTACHMENT_CACHE_MAX_AGE = 6 * 60 * 60  # seconds
+ATTACHMENT_CACHE_PRUNE_MINUTES = 10  # expire old entries even when no new attachments arrive
+ATTACHMENT_FETCH_CONCURRENCY = 4
+
 def load_config():
     if not os.path.exists(CONFIG_FILE):
         with open(CONFIG_FILE, "w") as f:
@@ -22,9 +35,145 @@ def save_config(data):
     with open(CONFIG_FILE, "w") as f:
         json.dump(data, f, indent=4)
 
+IGNORE_KINDS = ("channels", "categories", "roles", "users")
+IgnoreRules = namedtuple("IgnoreRules", IGNORE_KINDS)
+
+def compile_ignore_rules(config):
+    """Build ``{guild_id: IgnoreRules}`` from the ``modlog_ignore`` config sections.
+
+    Guilds without any rules are left out so the common case is a single dict miss.
+    """
+    compiled = {}
+    for gid, gcfg in config.items():
+        if not isinstance(gcfg, dict):
+            continue
+        raw = gcfg.get("modlog_ignore") or {}
+        rules = IgnoreRules(*(frozenset(int(i) for i in raw.get(kind, [])) for kind in IGNORE_KINDS))
+        if any(rules):
+            compiled[int(gid)] = rules
+    return compiled
+
+class AttachmentCache:
+    """Content-addressed disk cache for attachments of recent messages.
+
+    Files are stored once per SHA-256 digest and reference counted, so reposts
+    of the same file share one blob. Messages are evicted oldest first once the
+    cache exceeds its byte cap or an entry exceeds its maximum age.
+    """
+
+    def __init__(self, root, max_bytes, max_age):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.total_bytes = 0
+        self._messages = OrderedDict()  # message_id -> (stored_at, [(digest, filename)])
+        self._blobs = {}  # digest -> [size, refcount]
+        self._reset_dir()
+
+    def _reset_dir(self):
+        # Delete events only carry attachments for messages still in the client's
+        # message cache, which starts empty, so files from a previous run are dead weight.
+        os.makedirs(self.root, exist_ok=True)
+        for name in os.listdir(self.root):
+            try:
+                os.remove(os.path.join(self.root, name))
+            except OSError:
+                log.warning("Could not remove stale cached attachment %s", name)
+
+    def _path(self, digest):
+        return os.path.join(self.root, digest)
+
+    @staticmethod
+    def _write_blob(path, payload):
+        with open(path, "wb") as f:
+            f.write(payload)
+
+    async def add(self, message_id, files):
+        """Store ``(filename, bytes)`` pairs for a message."""
+        entries = []
+        for filename, payload in files:
+            digest = hashlib.sha256(payload).hexdigest()
+            if digest not in self._blobs:
+                await asyncio.to_thread(self._write_blob, self._path(digest), payload)
+                if digest not in self._blobs:
+                    self._blobs[digest] = [len(payload), 0]
+                    self.total_bytes += len(payload)
+            self._blobs[digest][1] += 1
+            entries.append((digest, filename))
+        if message_id in self._messages:
+            self.discard(message_id)
+        self._messages[message_id] = (time.monotonic(), entries)
+        self.evict()
+
+    def get(self, message_id):
+        """Return ``(path, filename)`` pairs for a cached message."""
+        self.evict()
+        entry = self._messages.get(message_id)
+        if not entry:
+            return []
+        return [(self._path(digest), filename) for digest, filename in entry[1]]
+
+    def discard(self, message_id):
+        entry = self._messages.pop(message_id, None)
+        if not entry:
+            return
+        for digest, _ in entry[1]:
+            blob = self._blobs.get(digest)
+            if not blob:
+                continue
+            blob[1] -= 1
+            if blob[1] <= 0:
+                del self._blobs[digest]
+                self.total_bytes -= blob[0]
+                try:
+                    os.remove(self._path(digest))
+                except OSError:
+                    pass
+
+    def evict(self):
+        cutoff = time.monotonic() - self.max_age
+        while self._messages:
+            message_id, (stored_at, _) = next(iter(self._messages.items()))
+            if stored_at >= cutoff and self.total_bytes <= self.max_bytes:
+                break
+            self.discard(message_id)
+
 class ModLog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.attachment_cache = AttachmentCache(ATTACHMENT_CACHE_DIR, ATTACHMENT_CACHE_MAX_BYTES, ATTACHMENT_CACHE_MAX_AGE)
+        self._fetch_semaphore = asyncio.Semaphore(ATTACHMENT_FETCH_CONCURRENCY)
+        config = load_config()
+        self._cache_guilds = {
+            gid for gid, gcfg in config.items()
+            if isinstance(gcfg, dict) and gcfg.get("attachment_cache")
+        }
+        self._ignore_rules = compile_ignore_rules(config)
+        self.prune_attachment_cache.start()
+
+    def cog_unload(self):
+        self.prune_attachment_cache.cancel()
+
+    @tasks.loop(minutes=ATTACHMENT_CACHE_PRUNE_MINUTES)
+    async def prune_attachment_cache(self):
+        self.attachment_cache.evict()
+
+    def is_ignored(self, guild_id, channel=None, user=None):
+        """Return True if an event in ``channel`` or by ``user`` should not be logged."""
+        rules = self._ignore_rules.get(guild_id)
+        if rules is None:
+            return False
+        if user is not None:
+            if user.id in rules.users:
+                return True
+            if rules.roles and any(role.id in rules.roles for role in getattr(user, "roles", ())):
+                return True
+        if channel is not None:
+            if channel.id in rules.channels or getattr(channel, "parent_id", None) in rules.channels:
+                return True
+            if getattr(channel, "category_id", None) in rules.categories:
+                return True
+        return False
 
     def get_chat_log_channel(self, guild_id):
         config = load_config()
@@ -80,11 +229,104 @@ class ModLog(commands.Cog):
         await ctx.reply(response, ephemeral=True)
         log.info(f"[MODLOG] Updated settings for {ctx.guild.name} ({guild_id})")
 
+    @commands.hybrid_command(name="setattachmentcache", description="Keep copies of recent attachments so deleted ones can be re-uploaded to the chat log.")
+    @commands.has_permissions(administrator=True)
+    async def set_attachment_cache(self, ctx, enabled: bool):
+        guild_id = str(ctx.guild.id)
+        config = load_config()
+        config.setdefault(guild_id, {})["attachment_cache"] = enabled
+        save_config(config)
+
+        if enabled:
+            self._cache_guilds.add(guild_id)
+            await ctx.reply("✅ Attachments of deleted messages will be re-uploaded to the chat log.", ephemeral=True)
+        else:
+            self._cache_guilds.discard(guild_id)
+            await ctx.reply("✅ Attachment cache disabled.", ephemeral=True)
+        log.info(f"[MODLOG] Attachment cache {'enabled' if enabled else 'disabled'} for {ctx.guild.name} ({guild_id})")
+
+    @commands.hybrid_command(name="modlogignore", description="Exclude channels, categories, roles or users from the mod log.")
+    @commands.has_permissions(administrator=True)
+    async def modlog_ignore(
+        self,
+        ctx,
+        action: Literal["add", "remove", "list"],
+        channel: Optional[discord.abc.GuildChannel] = None,
+        target: Optional[Union[discord.Member, discord.Role]] = None
+    ):
+        guild_id = str(ctx.guild.id)
+        config = load_config()
+        ignore = config.setdefault(guild_id, {}).setdefault("modlog_ignore", {})
+        for kind in IGNORE_KINDS:
+            ignore.setdefault(kind, [])
+
+        if action == "list":
+            lines = []
+            for kind, fmt in (("channels", "<#{}>"), ("categories", "<#{}>"), ("roles", "<@&{}>"), ("users", "<@{}>")):
+                if ignore[kind]:
+                    lines.append(f"**{kind.title()}:** " + ", ".join(fmt.format(i) for i in ignore[kind]))
+            await ctx.reply("\n".join(lines) or "No ModLog ignore rules set.", ephemeral=True)
+            return
+
+        changes = []
+        if channel is not None:
+            changes.append(("categories" if isinstance(channel, discord.CategoryChannel) else "channels", channel))
+        if target is not None:
+            changes.append(("roles" if isinstance(target, discord.Role) else "users", target))
+        if not changes:
+            await ctx.reply("❌ Provide a channel, category, role or user.", ephemeral=True)
+            return
+
+        for kind, obj in changes:
+            if action == "add" and obj.id not in ignore[kind]:
+                ignore[kind].append(obj.id)
+            elif action == "remove" and obj.id in ignore[kind]:
+                ignore[kind].remove(obj.id)
+
+        save_config(config)
+        self._ignore_rules = compile_ignore_rules(config)
+
+        verb = "Ignoring" if action == "add" else "No longer ignoring"
+        await ctx.reply(f"✅ {verb} " + ", ".join(obj.mention for _, obj in changes), ephemeral=True)
+        log.info(f"[MODLOG] Updated ignore rules for {ctx.guild.name} ({guild_id})")
+
+    async def _read_attachment(self, attachment):
+        async with self._fetch_semaphore:
+            try:
+                return attachment.filename, await attachment.read()
+            except discord.HTTPException as e:
+                log.debug(f"Could not cache attachment {attachment.id}: {e}")
+                return None
+
     # --- Message logs ---
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if not message.guild or not message.attachments or message.author.bot:
+            return
+        if self.is_ignored(message.guild.id, message.channel, message.author):
+            return
+        if str(message.guild.id) not in self._cache_guilds:
+            return
+        channel = self.get_chat_log_channel(message.guild.id)
+        if not channel or channel.id == message.channel.id:
+            return
+
+        max_bytes = min(ATTACHMENT_MAX_BYTES, message.guild.filesize_limit)
+        attachments = [att for att in message.attachments[:5] if att.size <= max_bytes]
+        if not attachments:
+            return
+        results = await asyncio.gather(*(self._read_attachment(att) for att in attachments))
+        files = [r for r in results if r]
+        if files:
+            await self.attachment_cache.add(message.id, files)
+
     @commands.Cog.listener()
     async def on_message_delete(self, message):
         if not message.guild or message.author.bot:
             return
+        if self.is_ignored(message.guild.id, message.channel, message.author):
+            self.attachment_cache.discard(message.id)
+            return
         channel = self.get_chat_log_channel(message.guild.id)
         if not channel:
             return
@@ -99,19 +341,47 @@ class ModLog(commands.Cog):
             embed.add_field(name="Channel", value=message.channel.mention, inline=True)
             embed.add_field(name="Content", value=message.content[:1024] if message.content else "*(no text)*", inline=False)
             
-            if message.attachments:
-                attachment_urls = "\n".join([att.url for att in message.attachments[:5]])
+            # Re-upload as many cached files as fit in one message to this guild
+            files = []
+            budget = channel.guild.filesize_limit
+            for path, filename in self.attachment_cache.get(message.id):
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                if size <= budget:
+                    files.append(discord.File(path, filename=filename))
+                    budget -= size
+            attachment_urls = "\n".join([att.url for att in message.attachments[:5]])
+            if files:
+                value = f"{len(files)} cached file(s) re-uploaded below"
+                if len(files) < len(message.attachments[:5]):
+                    value += "\n" + attachment_urls
+                embed.add_field(name="Attachments", value=value[:1024], inline=False)
+            elif message.attachments:
                 embed.add_field(name="Attachments", value=attachment_urls[:1024], inline=False)
             
             embed.set_footer(text=f"Message ID: {message.id}")
-            await channel.send(embed=embed)
+            try:
+                await channel.send(embed=embed, files=files)
+            except discord.HTTPException as e:
+                if not files:
+                    raise
+                # Still log the deletion, with the original links instead of the files
+                log.warning(f"Could not re-upload attachments for deleted message {message.id}: {e}")
+                embed.set_field_at(len(embed.fields) - 1, name="Attachments", value=attachment_urls[:1024] or "*(unavailable)*", inline=False)
+                await channel.send(embed=embed)
         except Exception as e:
             log.error(f"Error logging deleted message in guild {message.guild.id}: {e}")
+        finally:
+            self.attachment_cache.discard(message.id)
 
     @commands.Cog.listener()
     async def on_message_edit(self, before, after):
         if not before.guild or before.author.bot:
             return
+        if self.is_ignored(before.guild.id, before.channel, before.author):
+            return
         if before.content == after.content:
             return
         channel = self.get_chat_log_channel(before.guild.id)
@@ -137,6 +407,8 @@ class ModLog(commands.Cog):
     # --- Member logs ---
     @commands.Cog.listener()
     async def on_member_join(self, member):
+        if self.is_ignored(member.guild.id, user=member):
+            return
         channel = self.get_member_log_channel(member.guild.id)
         if not channel:
             return
@@ -157,6 +429,8 @@ class ModLog(commands.Cog):
 
     @commands.Cog.listener()
     async def on_member_remove(self, member):
+        if self.is_ignored(member.guild.id, user=member):
+            return
         channel = self.get_member_log_channel(member.guild.id)
         if not channel:
             return
@@ -187,6 +461,8 @@ class ModLog(commands.Cog):
 
     @commands.Cog.listener()
     async def on_member_ban(self, guild, user):
+        if self.is_ignored(guild.id, user=user):
+            return
         channel = self.get_member_log_channel(guild.id)
         if not channel:
             return
@@ -222,6 +498,8 @@ class ModLog(commands.Cog):
 
     @commands.Cog.listener()
     async def on_member_unban(self, guild, user):
+        if self.is_ignored(guild.id, user=user):
+            return
         channel = self.get_member_log_channel(guild.id)
         if not channel:
             return
@@ -256,6 +534,8 @@ class ModLog(commands.Cog):
     @commands.Cog.listener()
     async def on_member_update(self, before, after):
         """Log nickname and role changes"""
+        if self.is_ignored(before.guild.id, user=before):
+            return
         channel = self.get_member_log_channel(before.guild.id)
         if not channel:
             return
@@ -317,6 +597,8 @@ class ModLog(commands.Cog):
     @commands.Cog.listener()
     async def on_voice_state_update(self, member, before, after):
         """Log voice channel joins/leaves/moves with who moved them"""
+        if self.is_ignored(member.guild.id, before.channel, member) or self.is_ignored(member.guild.id, after.channel):
+            return
         # Use dedicated voice log channel, fallback to member log
         channel = self.get_voice_log_channel(member.guild.id)
         if not channel:
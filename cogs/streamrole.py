@@ -0,0 +1,163 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+import json
+import os
+import time
+import asyncio
+import logging
+
+log = logging.getLogger("streamrole_cog")
+CONFIG_FILE = "server_config.json"
+ROLE_CHANGE_WINDOW = 30  # at most one role change per member in this many seconds
+RECONCILE_CONCURRENCY = 5
+
+def load_json(path):
+    if not os.path.exists(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({}, f)
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError:
+            log.exception("JSON corrupted: %s", path)
+            return {}
+
+def save_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4)
+
+def is_streaming(member):
+    return any(isinstance(activity, discord.Streaming) for activity in member.activities)
+
+class StreamRoleCog(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.stream_roles = {}  # guild_id -> role_id
+        self.streaming = {}  # guild_id -> set of member IDs currently streaming
+        self._last_change = {}  # (guild_id, member_id) -> monotonic time of the last role change
+        self._pending = {}  # (guild_id, member_id) -> deferred sync task
+        self._reconcile_task = None
+        self.load_data()
+
+    def load_data(self):
+        cfg = load_json(CONFIG_FILE)
+        self.stream_roles = {
+            int(gid): gcfg["stream_role"]
+            for gid, gcfg in cfg.items()
+            if isinstance(gcfg, dict) and gcfg.get("stream_role")
+        }
+
+    def cog_load(self):
+        """Called when the cog is loaded"""
+        self._reconcile_task = asyncio.create_task(self.reconcile_all())
+
+    def cog_unload(self):
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
+        for task in self._pending.values():
+            task.cancel()
+        self._pending.clear()
+
+    @commands.Cog.listener()
+    async def on_presence_update(self, before, after):
+        if after.guild.id not in self.stream_roles:
+            return
+        streaming = self.streaming.setdefault(after.guild.id, set())
+        now_streaming = is_streaming(after)
+        if now_streaming == (after.id in streaming):
+            return
+        if now_streaming:
+            streaming.add(after.id)
+        else:
+            streaming.discard(after.id)
+        self.schedule_sync(after.guild, after.id)
+
+    def schedule_sync(self, guild, member_id):
+        """Sync the member's role now, or at the end of their change window.
+
+        While a sync is pending, further presence flaps only update the streaming
+        set; the deferred sync applies whatever state is current when it runs.
+        """
+        key = (guild.id, member_id)
+        if key in self._pending:
+            return
+        delay = self._last_change.get(key, 0) + ROLE_CHANGE_WINDOW - time.monotonic()
+        self._pending[key] = asyncio.create_task(self._sync_later(guild, member_id, max(delay, 0)))
+
+    async def _sync_later(self, guild, member_id, delay):
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            return
+        self._pending.pop((guild.id, member_id), None)
+        await self.sync_member(guild, member_id)
+
+    async def sync_member(self, guild, member_id):
+        role = guild.get_role(self.stream_roles.get(guild.id, 0))
+        member = guild.get_member(member_id)
+        if not role or not member:
+            return
+        wants_role = member_id in self.streaming.get(guild.id, ())
+        if wants_role == (member.get_role(role.id) is not None):
+            return
+        try:
+            if wants_role:
+                await member.add_roles(role, reason="Started streaming")
+            else:
+                await member.remove_roles(role, reason="Stopped streaming")
+            self._last_change[(guild.id, member_id)] = time.monotonic()
+        except discord.Forbidden:
+            log.error("Missing permission to manage stream role %s in guild %s", role.id, guild.id)
+        except discord.HTTPException as e:
+            log.warning("Failed to update stream role for %s in guild %s: %s", member_id, guild.id, e)
+
+    async def reconcile_guild(self, guild):
+        """Diff the role's members against live presences and fix the difference."""
+        role = guild.get_role(self.stream_roles.get(guild.id, 0))
+        if not role:
+            return
+        streaming = {m.id for m in guild.members if is_streaming(m)}
+        self.streaming[guild.id] = streaming
+        with_role = {m.id for m in role.members}
+        changes = (streaming - with_role) | (with_role - streaming)
+
+        semaphore = asyncio.Semaphore(RECONCILE_CONCURRENCY)
+
+        async def sync(member_id):
+            async with semaphore:
+                await self.sync_member(guild, member_id)
+
+        await asyncio.gather(*(sync(member_id) for member_id in changes))
+        if changes:
+            log.info("Reconciled stream role in guild %s: %d change(s)", guild.id, len(changes))
+
+    async def reconcile_all(self):
+        await self.bot.wait_until_ready()
+        for guild_id in list(self.stream_roles):
+            guild = self.bot.get_guild(guild_id)
+            if guild:
+                try:
+                    await self.reconcile_guild(guild)
+                except Exception:
+                    log.exception("Error reconciling stream role in guild %s", guild_id)
+
+    @app_commands.command(name="setstreamrole", description="Auto-assign a role to members while they are streaming")
+    @app_commands.describe(role="Role to give streaming members")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def setstreamrole(self, interaction: discord.Interaction, role: discord.Role):
+        if role >= interaction.guild.me.top_role:
+            await interaction.response.send_message("❌ That role is above my highest role, so I can't assign it.", ephemeral=True)
+            return
+
+        cfg = load_json(CONFIG_FILE)
+        cfg.setdefault(str(interaction.guild_id), {})["stream_role"] = role.id
+        save_json(CONFIG_FILE, cfg)
+        self.stream_roles[interaction.guild_id] = role.id
+
+        await interaction.response.send_message(f"✅ Members who are streaming will get {role.mention}", ephemeral=True)
+        await self.reconcile_guild(interaction.guild)
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(StreamRoleCog(bot))
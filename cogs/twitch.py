@@ -1,5 +1,8 @@
-import os, time, json, aiohttp, asyncio, logging
-from datetime import datetime, timedelta
+import os, time, json, aiohttp, asyncio, logging, hmac, hashlib, random
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
+from aiohttp import web
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
@@ -7,9 +10,44 @@ from discord import app_commands
 log = logging.getLogger("twitch_cog")
 CONFIG_FILE = "server_config.json"
 DATA_FILE = "data.json"
+CACHE_FILE = "twitch_cache.json"  # user and game metadata, kept apart from per-guild state
 TWITCH_CLIENT_ID = os.getenv("TWITCH_CLIENT_ID")
 TWITCH_CLIENT_SECRET = os.getenv("TWITCH_CLIENT_SECRET")
 POLL_SECONDS = 180  # 3 minutes
+HELIX_BATCH_SIZE = 100  # most user_login parameters Helix accepts per request
+TOKEN_EXPIRY_MARGIN = 60  # callers refresh a token this close to expiry...
+TOKEN_REFRESH_MARGIN = 15 * 60  # ...but the background refresh replaces it well before
+TOKEN_CHECK_MINUTES = 5
+HELIX_RETRIES = 3  # retries for 429, 5xx and connection errors
+HELIX_BACKOFF = 1  # base seconds for exponential backoff between retries
+HELIX_LATENCY_SAMPLES = 256  # recent request latencies kept per endpoint
+USER_CACHE_TTL = 24 * 60 * 60  # refetch profile pictures and display names daily
+USER_CACHE_SIZE = 2000
+GAME_CACHE_TTL = 7 * 24 * 60 * 60  # box art rarely changes
+GAME_CACHE_SIZE = 500
+
+# EventSub push delivery. With TWITCH_EVENTSUB_MODE=webhook an embedded HTTP server
+# listens on TWITCH_EVENTSUB_PORT; TWITCH_EVENTSUB_CALLBACK is the public https URL
+# that reaches it and TWITCH_EVENTSUB_SECRET (10-100 chars) signs the messages.
+# With TWITCH_EVENTSUB_MODE=websocket the bot connects out to Twitch instead, which
+# needs no public URL but does need a user access token for the same client ID in
+# TWITCH_EVENTSUB_USER_TOKEN. Streamers without a working subscription keep being polled.
+EVENTSUB_MODE = (os.getenv("TWITCH_EVENTSUB_MODE") or "").lower()
+EVENTSUB_CALLBACK = os.getenv("TWITCH_EVENTSUB_CALLBACK")
+EVENTSUB_SECRET = os.getenv("TWITCH_EVENTSUB_SECRET")
+EVENTSUB_PORT = int(os.getenv("TWITCH_EVENTSUB_PORT") or 8080)
+EVENTSUB_USER_TOKEN = os.getenv("TWITCH_EVENTSUB_USER_TOKEN")
+EVENTSUB_WS_URL = "wss://eventsub.wss.twitch.tv/ws"
+# WebSocket subscriptions are capped by cost, so only go-live is pushed there;
+# a new stream ID is what triggers a notification, so offline events are optional
+EVENTSUB_TYPES = ("stream.online",) if EVENTSUB_MODE == "websocket" else ("stream.online", "stream.offline")
+EVENTSUB_SYNC_MINUTES = 10  # recheck and renew subscriptions this often
+EVENTSUB_MAX_AGE = 10 * 60  # reject messages older than this to stop replays
+EVENTSUB_SEEN_IDS = 1000  # recent message IDs remembered to drop redelivered messages
+EVENTSUB_STREAM_RETRIES = 3  # Helix can lag the online event by a few seconds...
+EVENTSUB_STREAM_RETRY_SECONDS = 10  # ...so retry the stream lookup this often
+EVENTSUB_WS_KEEPALIVE_GRACE = 5  # extra seconds past the keepalive timeout before reconnecting
+EVENTSUB_WS_MAX_BACKOFF = 60  # longest wait between failed WebSocket connection attempts
 
 def load_json(path):
     if not os.path.exists(path):
@@ -26,16 +64,171 @@ def save_json(path, data):
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=4)
 
+class TTLCache:
+    """Least-recently-used mapping whose entries expire after ``ttl`` seconds.
+
+    Entries are stored as ``[stored_at, value]`` with wall-clock times so the
+    cache can be saved with ``dump()`` and restored across restarts.
+    """
+
+    def __init__(self, ttl, max_size, entries=None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        now = time.time()
+        for key, (stored_at, value) in (entries or {}).items():
+            if now - stored_at < ttl:
+                self.entries[key] = [stored_at, value]
+        self._evict()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry[0] >= self.ttl:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, value):
+        self.entries[key] = [time.time(), value]
+        self.entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self):
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def dump(self):
+        return dict(self.entries)
+
+class HelixClient:
+    """Shared client for every ``api.twitch.tv/helix`` call.
+
+    Requests draw from a token bucket refilled from Twitch's ``Ratelimit-Remaining``
+    and ``Ratelimit-Reset`` headers, so a burst waits for the window to reset
+    instead of collecting 429s. 429, 5xx and connection errors are retried with
+    jittered exponential backoff, and a 401 replaces the rejected app token once.
+    """
+
+    BASE_URL = "https://api.twitch.tv/helix/"
+
+    def __init__(self, session, get_token):
+        self.session = session
+        self.get_token = get_token  # coroutine function taking stale=None
+        self.limit = None
+        self.remaining = None  # unknown until the first response
+        self.reset_at = 0.0  # Unix time the bucket refills
+        self.stats = {}  # endpoint -> call, error and retry counts plus recent latencies
+
+    async def _take(self):
+        while self.remaining is not None and self.remaining <= 0:
+            wait = self.reset_at - time.time()
+            if wait <= 0:
+                self.remaining = self.limit
+                break
+            await asyncio.sleep(wait)
+        if self.remaining is not None:
+            self.remaining -= 1
+
+    def _update_limits(self, headers):
+        try:
+            self.limit = int(headers["Ratelimit-Limit"])
+            self.remaining = int(headers["Ratelimit-Remaining"])
+            self.reset_at = float(headers["Ratelimit-Reset"])
+        except (KeyError, ValueError):
+            pass
+
+    async def request(self, method, endpoint, *, token=None, **kwargs):
+        """Send a Helix request and return ``(status, json)``; status is None if it never got a response.
+
+        ``token`` overrides the app token (for user-token endpoints) and is never refreshed.
+        """
+        stats = self.stats.setdefault(endpoint, {"calls": 0, "errors": 0, "retries": 0, "latency": deque(maxlen=HELIX_LATENCY_SAMPLES)})
+        stats["calls"] += 1
+        refreshed = False
+        status, body = None, {}
+        attempt = 0
+        while True:
+            auth = token or await self.get_token()
+            if not auth:
+                break
+            await self._take()
+            headers = {"Client-ID": TWITCH_CLIENT_ID, "Authorization": f"Bearer {auth}"}
+            start = time.monotonic()
+            try:
+                async with self.session.request(method, self.BASE_URL + endpoint, headers=headers, **kwargs) as r:
+                    self._update_limits(r.headers)
+                    status = r.status
+                    body = await r.json() if r.content_type == "application/json" else {}
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                status, body = None, {"message": str(e)}
+            stats["latency"].append(time.monotonic() - start)
+
+            if status == 401 and token is None and not refreshed:
+                refreshed = True
+                await self.get_token(stale=auth)
+                continue
+            if status == 429:
+                delay = max(self.reset_at - time.time(), 0) + random.uniform(0, HELIX_BACKOFF)
+            elif status is None or status >= 500:
+                delay = HELIX_BACKOFF * 2 ** attempt * random.uniform(0.5, 1.5)
+            else:
+                break
+            if attempt >= HELIX_RETRIES:
+                break
+            attempt += 1
+            stats["retries"] += 1
+            log.debug("Helix %s %s got %s; retry %d in %.1fs", method, endpoint, status, attempt, delay)
+            await asyncio.sleep(delay)
+
+        if status is None or status >= 400:
+            stats["errors"] += 1
+        return status, body
+
+    def describe(self):
+        """One line per endpoint for /twitchstatus."""
+        lines = []
+        for endpoint, stats in sorted(self.stats.items()):
+            latency = sorted(stats["latency"])
+            p50 = latency[len(latency) // 2] * 1000 if latency else 0
+            p95 = latency[min(len(latency) - 1, int(len(latency) * 0.95))] * 1000 if latency else 0
+            lines.append(
+                f"`{endpoint}`: {stats['calls']} calls, {stats['errors']} errors, {stats['retries']} retries, "
+                f"p50 {p50:.0f}ms / p95 {p95:.0f}ms"
+            )
+        if self.remaining is not None:
+            lines.append(f"Rate limit: {self.remaining}/{self.limit} left")
+        return "\n".join(lines) or "No requests yet"
+
+def eventsub_signature(secret, message_id, timestamp, body):
+    """The ``Twitch-Eventsub-Message-Signature`` value Twitch sends for a message."""
+    mac = hmac.new(secret.encode(), message_id.encode() + timestamp.encode() + body, hashlib.sha256)
+    return "sha256=" + mac.hexdigest()
+
 class TwitchCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.session = aiohttp.ClientSession()
+        self.helix = HelixClient(self.session, self._ensure_token)
         self._token = None
         self._token_expires = 0
-        self._user_cache = {}
-        self._game_cache = {}
+        self._token_refresh = None  # in-flight refresh shared by concurrent callers
+        cache = load_json(CACHE_FILE)
+        self._user_cache = TTLCache(USER_CACHE_TTL, USER_CACHE_SIZE, cache.get("users"))  # login -> user info
+        self._game_cache = TTLCache(GAME_CACHE_TTL, GAME_CACHE_SIZE, cache.get("games"))  # game_id -> box art URL
+        self.eventsub_subs = {}  # (broadcaster_id, type) -> subscription status
+        self._broadcaster_logins = {}  # broadcaster_id -> login
+        self._eventsub_seen = OrderedDict()  # message IDs already handled
+        self._eventsub_runner = None
+        self._eventsub_task = None
+        self._ws_session_id = None
+        self.stream_state = {}  # gid -> {username: {"notified", "last_stream"}}, the source of truth for data.json
+        self._state_lock = asyncio.Lock()  # held while announcing, so two paths never notify the same stream
         self._initialize_data()
         self.check_streams.start()
+        self.refresh_token_early.start()
 
     def _initialize_data(self):
         cfg = load_json(CONFIG_FILE)
@@ -48,49 +241,86 @@ class TwitchCog(commands.Cog):
         
         save_json(DATA_FILE, d)
         save_json(CONFIG_FILE, cfg)
+        self.stream_state = {gid: gdata["twitch"] for gid, gdata in d.items() if isinstance(gdata, dict) and "twitch" in gdata}
+
+    def _persist_stream_state(self, gids):
+        """Write the in-memory Twitch state of ``gids`` to data.json, leaving other keys untouched."""
+        data = load_json(DATA_FILE)
+        for gid in gids:
+            data.setdefault(gid, {})["twitch"] = self.stream_state.get(gid, {})
+        save_json(DATA_FILE, data)
+
+    def cog_load(self):
+        """Called when the cog is loaded"""
+        if EVENTSUB_MODE == "webhook":
+            if not EVENTSUB_CALLBACK or not 10 <= len(EVENTSUB_SECRET or "") <= 100:
+                log.error("EventSub webhook needs TWITCH_EVENTSUB_CALLBACK and a 10-100 character TWITCH_EVENTSUB_SECRET; polling only")
+            else:
+                asyncio.create_task(self.start_eventsub_webhook())
+        elif EVENTSUB_MODE == "websocket":
+            if not EVENTSUB_USER_TOKEN:
+                log.error("EventSub WebSocket needs TWITCH_EVENTSUB_USER_TOKEN; polling only")
+            else:
+                self._eventsub_task = asyncio.create_task(self.run_eventsub_websocket())
 
     def cog_unload(self):
         self.check_streams.cancel()
+        self.refresh_token_early.cancel()
+        self.sync_eventsub.cancel()
+        if self._eventsub_task:
+            self._eventsub_task.cancel()
         try:
+            if self._eventsub_runner:
+                asyncio.create_task(self._eventsub_runner.cleanup())
             asyncio.create_task(self.session.close())
         except Exception:
             pass
 
+    def _save_cache(self):
+        save_json(CACHE_FILE, {"users": self._user_cache.dump(), "games": self._game_cache.dump()})
+
     async def _fetch_game_image(self, game_id: str):
         if not game_id:
             return None
-            
-        if game_id in self._game_cache:
-            return self._game_cache[game_id]
-            
-        token = await self._ensure_token()
-        if not token:
-            return None
-            
-        url = "https://api.twitch.tv/helix/games"
-        headers = {"Client-ID": TWITCH_CLIENT_ID, "Authorization": f"Bearer {token}"}
-        params = {"id": game_id}
+        images = await self._fetch_game_images([game_id])
+        return images.get(game_id)
+
+    async def _fetch_game_images(self, game_ids):
+        """Box art URLs for many games, served from the cache or one batched ``/helix/games`` lookup."""
+        images = {}
+        missing = set()
+        for game_id in filter(None, game_ids):
+            box_art = self._game_cache.get(game_id)
+            if box_art:
+                images[game_id] = box_art
+            else:
+                missing.add(game_id)
+        if not missing:
+            return images
         
-        try:
-            async with self.session.get(url, headers=headers, params=params) as r:
-                if r.status != 200:
-                    return None
-                j = await r.json()
-                data = j.get("data", [])
-                if not data:
-                    return None
-                    
-                box_art = data[0].get("box_art_url", "").replace("{width}", "285").replace("{height}", "380")
-                self._game_cache[game_id] = box_art
-                return box_art
-        except Exception as e:
-            log.debug("Error fetching game image for %s: %s", game_id, e)
-            return None
+        games, _ = await self._helix_batched("games", "id", missing)
+        for game in games:
+            box_art = game.get("box_art_url", "").replace("{width}", "285").replace("{height}", "380")
+            self._game_cache.put(game["id"], box_art)
+            images[game["id"]] = box_art
+        self._save_cache()
+        return images
 
-    async def _ensure_token(self):
-        now = int(time.time())
-        if self._token and now < self._token_expires - 60:
+    async def _ensure_token(self, stale=None):
+        """Return a valid app token, refreshing it when it is missing or about to expire.
+
+        Concurrent callers share a single in-flight refresh. ``stale`` is a token
+        Twitch just rejected; it is replaced unless another caller already did.
+        """
+        if self._token and self._token != stale and time.time() < self._token_expires - TOKEN_EXPIRY_MARGIN:
             return self._token
+        if self._token_refresh is None or self._token_refresh.done():
+            self._token_refresh = asyncio.create_task(self._refresh_token())
+        # Shielded so one caller being cancelled doesn't abort the refresh for the rest
+        return await asyncio.shield(self._token_refresh)
+
+    async def _refresh_token(self):
+        now = int(time.time())
         if not TWITCH_CLIENT_ID or not TWITCH_CLIENT_SECRET:
             log.warning("Twitch credentials missing; Twitch disabled")
             return None
@@ -110,6 +340,12 @@ class TwitchCog(commands.Cog):
             log.error("Exception getting Twitch token: %s", e)
             return None
 
+    @tasks.loop(minutes=TOKEN_CHECK_MINUTES)
+    async def refresh_token_early(self):
+        """Replace the app token before it expires so polls never wait on OAuth."""
+        if not self._token or time.time() > self._token_expires - TOKEN_REFRESH_MARGIN:
+            await self._ensure_token(stale=self._token)
+
     async def _extract_username_from_url(self, url: str):
         import re
         match = re.search(r'twitch\.tv/([a-zA-Z0-9_]+)', url)
@@ -118,56 +354,93 @@ class TwitchCog(commands.Cog):
         return None
 
     async def _fetch_user_info(self, username: str):
-        if username in self._user_cache:
-            return self._user_cache[username]
-            
-        token = await self._ensure_token()
-        if not token:
-            return None
-            
-        url = "https://api.twitch.tv/helix/users"
-        headers = {"Client-ID": TWITCH_CLIENT_ID, "Authorization": f"Bearer {token}"}
-        params = {"login": username}
+        infos = await self._fetch_user_infos([username])
+        return infos.get(username.lower())
+
+    async def _fetch_user_infos(self, usernames):
+        """Profile info for many logins, served from the cache or batched ``/helix/users`` lookups."""
+        infos = {}
+        missing = set()
+        for login in {u.lower() for u in usernames}:
+            user_info = self._user_cache.get(login)
+            if user_info:
+                infos[login] = user_info
+            else:
+                missing.add(login)
+        if not missing:
+            return infos
         
-        try:
-            async with self.session.get(url, headers=headers, params=params) as r:
-                if r.status != 200:
-                    log.debug("Twitch user API error for %s: %s", username, await r.text())
-                    return None
-                j = await r.json()
-                data = j.get("data", [])
-                if not data:
-                    return None
-                    
-                user_info = {
-                    "profile_image": data[0].get("profile_image_url"),
-                    "display_name": data[0].get("display_name", username)
-                }
-                self._user_cache[username] = user_info
-                return user_info
-        except Exception as e:
-            log.debug("Exception fetching user info for %s: %s", username, e)
-            return None
+        users, _ = await self._fetch_users(missing)
+        for login, user in users.items():
+            user_info = {
+                "profile_image": user.get("profile_image_url"),
+                "display_name": user.get("display_name", login)
+            }
+            self._user_cache.put(login, user_info)
+            infos[login] = user_info
+        self._save_cache()
+        return infos
 
     async def _fetch_stream(self, username: str):
-        token = await self._ensure_token()
-        if not token:
-            return None
-        url = "https://api.twitch.tv/helix/streams"
-        headers = {"Client-ID": TWITCH_CLIENT_ID, "Authorization": f"Bearer {token}"}
-        params = {"user_login": username}
+        streams = await self._fetch_streams([username])
+        return streams.get(username.lower())
+
+    async def _fetch_streams(self, usernames):
+        """Look up live streams for many logins, up to 100 per Helix request, in parallel.
+
+        Returns ``{login: stream or None}`` for every login that was checked. Logins
+        whose batch failed are left out, so callers can tell "offline" from "unknown".
+        """
+        logins = sorted({u.lower() for u in usernames})
+        batches = [logins[i:i + HELIX_BATCH_SIZE] for i in range(0, len(logins), HELIX_BATCH_SIZE)]
+        results = await asyncio.gather(*(self._fetch_stream_batch(batch) for batch in batches))
         
-        try:
-            async with self.session.get(url, headers=headers, params=params) as r:
-                if r.status != 200:
-                    log.debug("Twitch API non-200 for %s: %s", username, await r.text())
-                    return None
-                j = await r.json()
-                items = j.get("data", [])
-                return items[0] if items else None
-        except Exception as e:
-            log.debug("Exception fetching stream for %s: %s", username, e)
-            return None
+        streams = {}
+        for result in results:
+            streams.update(result)
+        return streams
+
+    async def _fetch_stream_batch(self, logins):
+        params = [("user_login", login) for login in logins] + [("first", str(HELIX_BATCH_SIZE))]
+        status, j = await self.helix.request("GET", "streams", params=params)
+        if status != 200:
+            log.warning("Twitch stream lookup failed for %d logins (%s): %s", len(logins), status, j.get("message"))
+            return {}
+        
+        streams = dict.fromkeys(logins)
+        for item in j.get("data", []):
+            login = item.get("user_login", "").lower()
+            if login in streams:
+                streams[login] = item
+        return streams
+
+    async def _fetch_users(self, usernames):
+        """Look up ``({login: Helix user}, complete)`` for many logins, up to 100 per request.
+
+        ``complete`` is False if any batch failed, so a missing login may still exist.
+        """
+        users, complete = await self._helix_batched("users", "login", {u.lower() for u in usernames})
+        return {user["login"].lower(): user for user in users}, complete
+
+    async def _helix_batched(self, endpoint, param, values):
+        """GET ``/helix/<endpoint>`` for many values of ``param``, 100 per request in parallel.
+
+        Returns ``(items, complete)``: the combined ``data`` items, and False for
+        ``complete`` if any batch failed and contributed nothing.
+        """
+        values = sorted(values)
+        
+        async def fetch(batch):
+            status, j = await self.helix.request("GET", endpoint, params=[(param, value) for value in batch])
+            if status != 200:
+                log.debug("Twitch %s API error for %d IDs (%s): %s", endpoint, len(batch), status, j.get("message"))
+                return None
+            return j.get("data", [])
+        
+        batches = [values[i:i + HELIX_BATCH_SIZE] for i in range(0, len(values), HELIX_BATCH_SIZE)]
+        results = await asyncio.gather(*(fetch(batch) for batch in batches))
+        items = [item for result in results if result for item in result]
+        return items, None not in results
 
     async def _send_stream_notification(self, guild, channel, role, username, stream, force=False):
         try:
@@ -255,15 +528,13 @@ class TwitchCog(commands.Cog):
             log.error("Unexpected error sending Twitch notification: %s", e)
             return False
 
-    @tasks.loop(seconds=POLL_SECONDS)
-    async def check_streams(self):
-        cfg = load_json(CONFIG_FILE)
-        data = load_json(DATA_FILE)
-        changed = False
-        
-        for gid in cfg.keys():
-            data.setdefault(gid, {}).setdefault("twitch", {})
-        
+    def _stream_targets(self, cfg):
+        """Reverse index of ``{login: [(gid, guild, channel, role, username), ...]}``.
+
+        Each streamer appears once however many guilds track them, so a poll
+        costs one lookup per unique login rather than one per subscription.
+        """
+        targets = {}
         for gid, gcfg in cfg.items():
             guild = self.bot.get_guild(int(gid))
             if not guild:
@@ -286,39 +557,335 @@ class TwitchCog(commands.Cog):
                 
             role = guild.get_role(role_id)
             
-            for username in list(streamers):
-                try:
-                    stream = await self._fetch_stream(username)
-                    metas = data.setdefault(gid, {}).setdefault("twitch", {})
-                    meta = metas.setdefault(username, {"notified": None, "last_stream": None})
+            for username in streamers:
+                targets.setdefault(username.lower(), []).append((gid, guild, channel, role, username))
+        return targets
+
+    async def _announce_stream(self, targets, stream):
+        """Fan one login's stream state out to every subscribed guild.
+
+        Must be called with ``_state_lock`` held. Returns the guild IDs whose state changed.
+        """
+        changed = set()
+        for gid, guild, channel, role, username in targets:
+            try:
+                meta = self.stream_state.setdefault(gid, {}).setdefault(username, {"notified": None, "last_stream": None})
+                
+                if stream:
+                    sid = stream.get("id")
                     
-                    if stream:
-                        sid = stream.get("id")
-                        
-                        meta["last_stream"] = stream
-                        changed = True
-                        
-                        if meta.get("notified") == sid:
-                            continue
-                        
-                        success = await self._send_stream_notification(guild, channel, role, username, stream)
-                        if success:
-                            data[gid]["twitch"][username]["notified"] = sid
-                            changed = True
-                    else:
-                        if meta.get("notified"):
-                            data[gid]["twitch"][username]["notified"] = None
-                            changed = True
-                except Exception:
-                    log.exception("Error checking streamer %s in guild %s", username, gid)
+                    meta["last_stream"] = stream
+                    changed.add(gid)
+                    
+                    if meta.get("notified") == sid:
+                        continue
                     
-        if changed:
-            save_json(DATA_FILE, data)
+                    success = await self._send_stream_notification(guild, channel, role, username, stream)
+                    if success:
+                        meta["notified"] = sid
+                elif meta.get("notified"):
+                    meta["notified"] = None
+                    changed.add(gid)
+            except Exception:
+                log.exception("Error checking streamer %s in guild %s", username, gid)
+        return changed
+
+    @tasks.loop(seconds=POLL_SECONDS)
+    async def check_streams(self):
+        await self.poll_streams()
+
+    async def poll_streams(self, include_pushed=False):
+        """Fetch every tracked streamer in batches and announce changes.
+
+        Streamers covered by EventSub are skipped unless ``include_pushed`` is
+        set, as when reconciling after the push connection was down.
+        """
+        cfg = load_json(CONFIG_FILE)
+        targets = self._stream_targets(cfg)
+        # Streamers with working EventSub subscriptions are pushed to us instead
+        for login in () if include_pushed else self.eventsub_logins():
+            targets.pop(login, None)
+        # Held from the lookup on, so a pushed go-live can't land between our fetch
+        # and our "offline" verdict and then be announced a second time
+        async with self._state_lock:
+            streams = await self._fetch_streams(targets)
+            
+            # Warm the metadata caches for everyone live in two batched calls, not one per notification
+            live = [stream for stream in streams.values() if stream]
+            if live:
+                await asyncio.gather(
+                    self._fetch_user_infos(stream["user_login"] for stream in live),
+                    self._fetch_game_images(stream.get("game_id") for stream in live)
+                )
+            
+            changed = set()
+            for login, subscribers in targets.items():
+                if login not in streams:
+                    # Lookup failed this cycle; keep the notified state as it is
+                    continue
+                changed |= await self._announce_stream(subscribers, streams[login])
+            if changed:
+                self._persist_stream_state(changed)
 
     @check_streams.before_loop
     async def before_check(self):
         await self.bot.wait_until_ready()
 
+    def eventsub_logins(self):
+        """Logins with every EventSub subscription type enabled, which need no polling."""
+        enabled = {key for key, status in self.eventsub_subs.items() if status == "enabled"}
+        return {
+            login
+            for broadcaster_id, login in self._broadcaster_logins.items()
+            if all((broadcaster_id, sub_type) in enabled for sub_type in EVENTSUB_TYPES)
+        }
+
+    def _eventsub_transport(self):
+        if EVENTSUB_MODE == "websocket":
+            return {"method": "websocket", "session_id": self._ws_session_id}
+        return {"method": "webhook", "callback": EVENTSUB_CALLBACK, "secret": EVENTSUB_SECRET}
+
+    def _is_our_transport(self, transport):
+        if EVENTSUB_MODE == "websocket":
+            return transport.get("method") == "websocket" and transport.get("session_id") == self._ws_session_id
+        return transport.get("method") == "webhook" and transport.get("callback") == EVENTSUB_CALLBACK
+
+    async def start_eventsub_webhook(self):
+        app = web.Application()
+        app.router.add_post(urlparse(EVENTSUB_CALLBACK).path or "/", self.handle_eventsub)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, port=EVENTSUB_PORT).start()
+        except OSError as e:
+            log.error("Could not start EventSub webhook server on port %s: %s; polling only", EVENTSUB_PORT, e)
+            await runner.cleanup()
+            return
+        self._eventsub_runner = runner
+        log.info("EventSub webhook listening on port %s for %s", EVENTSUB_PORT, EVENTSUB_CALLBACK)
+        self.sync_eventsub.start()
+
+    async def handle_eventsub(self, request):
+        body = await request.read()
+        message_id = request.headers.get("Twitch-Eventsub-Message-Id", "")
+        timestamp = request.headers.get("Twitch-Eventsub-Message-Timestamp", "")
+        signature = request.headers.get("Twitch-Eventsub-Message-Signature", "")
+        if not hmac.compare_digest(eventsub_signature(EVENTSUB_SECRET, message_id, timestamp, body), signature):
+            log.warning("Rejected EventSub message %s with a bad signature", message_id)
+            return web.Response(status=403)
+        try:
+            # Twitch sends nanosecond precision; seconds are plenty for the replay window
+            sent_at = datetime.fromisoformat(timestamp[:19]).replace(tzinfo=timezone.utc)
+        except ValueError:
+            return web.Response(status=400)
+        if abs((datetime.now(timezone.utc) - sent_at).total_seconds()) > EVENTSUB_MAX_AGE:
+            log.warning("Rejected stale EventSub message %s from %s", message_id, timestamp)
+            return web.Response(status=403)
+
+        payload = json.loads(body)
+        subscription = payload.get("subscription", {})
+        message_type = request.headers.get("Twitch-Eventsub-Message-Type")
+        if message_type == "webhook_callback_verification":
+            self._track_subscription(subscription, "enabled")
+            log.info("Verified EventSub %s subscription %s", subscription.get("type"), subscription.get("id"))
+            return web.Response(text=payload.get("challenge", ""), content_type="text/plain")
+
+        # Twitch redelivers until it sees a 2xx, so each message ID is handled once
+        if not self._remember_message(message_id):
+            return web.Response(status=204)
+
+        if message_type == "notification":
+            asyncio.create_task(self.handle_stream_event(subscription.get("type"), payload.get("event", {})))
+        elif message_type == "revocation":
+            self._track_subscription(subscription, None)
+            log.warning("EventSub %s subscription %s revoked (%s); polling that streamer", subscription.get("type"), subscription.get("id"), subscription.get("status"))
+        return web.Response(status=204)
+
+    def _remember_message(self, message_id):
+        """Record ``message_id``; returns False if it was already handled."""
+        if message_id in self._eventsub_seen:
+            return False
+        self._eventsub_seen[message_id] = True
+        if len(self._eventsub_seen) > EVENTSUB_SEEN_IDS:
+            self._eventsub_seen.popitem(last=False)
+        return True
+
+    async def run_eventsub_websocket(self):
+        """Keep an EventSub WebSocket open, reconnecting with backoff when it drops."""
+        await self.bot.wait_until_ready()
+        backoff = 1
+        while True:
+            try:
+                if await self._eventsub_websocket_session():
+                    backoff = 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("EventSub WebSocket error: %s", e)
+            # The subscriptions died with the session; poll everyone until resubscribed
+            self._ws_session_id = None
+            self.eventsub_subs.clear()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, EVENTSUB_WS_MAX_BACKOFF)
+
+    async def _eventsub_websocket_session(self):
+        """Run one EventSub session, following ``session_reconnect`` hand-offs.
+
+        Returns True if the session got as far as a welcome message.
+        """
+        ws = await self.session.ws_connect(EVENTSUB_WS_URL)
+        welcomed = False
+        keepalive = 10  # until the welcome says otherwise
+        try:
+            while True:
+                try:
+                    msg = await ws.receive(timeout=keepalive + EVENTSUB_WS_KEEPALIVE_GRACE)
+                except asyncio.TimeoutError:
+                    log.warning("EventSub WebSocket missed its keepalive; reconnecting")
+                    return welcomed
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    log.info("EventSub WebSocket closed (%s)", ws.close_code)
+                    return welcomed
+
+                message = json.loads(msg.data)
+                metadata, payload = message.get("metadata", {}), message.get("payload", {})
+                message_type = metadata.get("message_type")
+                if message_type == "session_welcome":
+                    session = payload.get("session", {})
+                    keepalive = session.get("keepalive_timeout_seconds") or keepalive
+                    self._ws_session_id = session.get("id")
+                    welcomed = True
+                    log.info("EventSub WebSocket session %s started", self._ws_session_id)
+                    # A fresh session has no subscriptions; subscribe, then catch up on anything missed
+                    if self.sync_eventsub.is_running():
+                        self.sync_eventsub.restart()
+                    else:
+                        self.sync_eventsub.start()
+                    asyncio.create_task(self.poll_streams(include_pushed=True))
+                elif message_type == "session_reconnect":
+                    # Subscriptions carry over; open the new URL before letting go of the old one
+                    new_ws = await self.session.ws_connect(payload.get("session", {}).get("reconnect_url"))
+                    welcome = await new_ws.receive_json(timeout=keepalive + EVENTSUB_WS_KEEPALIVE_GRACE)
+                    await ws.close()
+                    ws = new_ws
+                    self._ws_session_id = welcome.get("payload", {}).get("session", {}).get("id", self._ws_session_id)
+                    log.info("EventSub WebSocket reconnected as requested by Twitch")
+                    asyncio.create_task(self.poll_streams(include_pushed=True))
+                elif message_type == "notification":
+                    if self._remember_message(metadata.get("message_id")):
+                        asyncio.create_task(self.handle_stream_event(metadata.get("subscription_type"), payload.get("event", {})))
+                elif message_type == "revocation":
+                    subscription = payload.get("subscription", {})
+                    self._track_subscription(subscription, None)
+                    log.warning("EventSub %s subscription %s revoked (%s); polling that streamer", subscription.get("type"), subscription.get("id"), subscription.get("status"))
+        finally:
+            await ws.close()
+
+    def _track_subscription(self, subscription, status):
+        key = (subscription.get("condition", {}).get("broadcaster_user_id"), subscription.get("type"))
+        if status is None:
+            self.eventsub_subs.pop(key, None)
+        else:
+            self.eventsub_subs[key] = status
+
+    async def handle_stream_event(self, sub_type, event):
+        """Announce a pushed ``stream.online``/``stream.offline`` to every guild tracking the streamer."""
+        login = event.get("broadcaster_user_login", "").lower()
+        targets = self._stream_targets(load_json(CONFIG_FILE)).get(login)
+        if not targets:
+            return
+        stream = None
+        if sub_type == "stream.online":
+            for attempt in range(EVENTSUB_STREAM_RETRIES):
+                stream = (await self._fetch_streams([login])).get(login)
+                if stream:
+                    break
+                await asyncio.sleep(EVENTSUB_STREAM_RETRY_SECONDS)
+            if not stream:
+                log.warning("Got stream.online for %s but Helix has no stream yet", login)
+                return
+        elif sub_type != "stream.offline":
+            return
+        async with self._state_lock:
+            changed = await self._announce_stream(targets, stream)
+            if changed:
+                self._persist_stream_state(changed)
+
+    async def _helix_eventsub(self, method, **kwargs):
+        """Call the Helix EventSub subscriptions endpoint; returns ``(status, json)``."""
+        # WebSocket transports may only be managed with a user access token
+        token = EVENTSUB_USER_TOKEN if EVENTSUB_MODE == "websocket" else None
+        return await self.helix.request(method, "eventsub/subscriptions", token=token, **kwargs)
+
+    async def _list_eventsub_subscriptions(self):
+        subs, cursor = [], None
+        while True:
+            status, j = await self._helix_eventsub("GET", params={"after": cursor} if cursor else None)
+            if status != 200:
+                return None
+            subs.extend(j.get("data", []))
+            cursor = j.get("pagination", {}).get("cursor")
+            if not cursor:
+                return subs
+
+    async def _create_eventsub_subscription(self, broadcaster_id, sub_type):
+        body = {
+            "type": sub_type,
+            "version": "1",
+            "condition": {"broadcaster_user_id": broadcaster_id},
+            "transport": self._eventsub_transport()
+        }
+        status, j = await self._helix_eventsub("POST", json=body)
+        if status == 202 and j.get("data"):
+            self._track_subscription(j["data"][0], j["data"][0].get("status"))
+        else:
+            log.warning("Could not subscribe to %s for %s (%s): %s", sub_type, broadcaster_id, status, j.get("message"))
+
+    @tasks.loop(minutes=EVENTSUB_SYNC_MINUTES)
+    async def sync_eventsub(self):
+        """Make Twitch's subscriptions match the tracked streamers.
+
+        Subscriptions that failed or were revoked are deleted and recreated, and
+        ones for streamers nobody tracks any more are removed. Anything that
+        cannot be subscribed stays on the polling loop.
+        """
+        if EVENTSUB_MODE == "websocket" and not self._ws_session_id:
+            return
+        logins = set(self._stream_targets(load_json(CONFIG_FILE)))
+        users, complete = await self._fetch_users(logins)
+        if not complete:
+            # A failed lookup would look like untracked streamers and delete their subscriptions
+            log.warning("Could not look up all tracked Twitch users; keeping EventSub subscriptions as they are")
+            return
+        self._broadcaster_logins = {user["id"]: login for login, user in users.items()}
+        wanted = {(broadcaster_id, sub_type) for broadcaster_id in self._broadcaster_logins for sub_type in EVENTSUB_TYPES}
+
+        existing = await self._list_eventsub_subscriptions()
+        if existing is None:
+            log.warning("Could not list EventSub subscriptions; polling all streamers")
+            self.eventsub_subs.clear()
+            return
+
+        current, stale = {}, []
+        for sub in existing:
+            if not self._is_our_transport(sub.get("transport", {})):
+                continue
+            key = (sub.get("condition", {}).get("broadcaster_user_id"), sub.get("type"))
+            if key in wanted and key not in current and sub.get("status") in ("enabled", "webhook_callback_verification_pending"):
+                current[key] = sub["status"]
+            else:
+                stale.append(sub["id"])
+        self.eventsub_subs = current
+
+        await asyncio.gather(*(self._helix_eventsub("DELETE", params={"id": sub_id}) for sub_id in stale))
+        await asyncio.gather(*(self._create_eventsub_subscription(*key) for key in wanted - current.keys()))
+        if stale or wanted - current.keys():
+            log.info("Synced EventSub: %d stale removed, %d created, %d streamers pushed", len(stale), len(wanted - current.keys()), len(self.eventsub_logins()))
+
+    @sync_eventsub.before_loop
+    async def before_sync_eventsub(self):
+        await self.bot.wait_until_ready()
+
     @app_commands.command(name="twitchstatus", description="Check Twitch configuration status")
     @app_commands.checks.has_permissions(administrator=True)
     async def twitchstatus(self, interaction: discord.Interaction):
@@ -352,6 +919,14 @@ class TwitchCog(commands.Cog):
             embed.add_field(name="Twitch API", value="✅ Configured", inline=True)
         else:
             embed.add_field(name="Twitch API", value="❌ Missing credentials", inline=True)
+        
+        if self.sync_eventsub.is_running():
+            pushed = sum(1 for s in streamers if s.lower() in self.eventsub_logins())
+            delivery = f"EventSub {EVENTSUB_MODE}: {pushed}/{len(streamers)} pushed, rest polled every {POLL_SECONDS // 60} min"
+        else:
+            delivery = f"Polling every {POLL_SECONDS // 60} min"
+        embed.add_field(name="Delivery", value=delivery, inline=False)
+        embed.add_field(name="Helix API", value=self.helix.describe(), inline=False)
             
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
@@ -389,9 +964,8 @@ class TwitchCog(commands.Cog):
         }
         save_json(CONFIG_FILE, cfg)
         
-        data = load_json(DATA_FILE)
-        data.setdefault(gid, {}).setdefault("twitch", {}).setdefault(username, {"notified": None})
-        save_json(DATA_FILE, data)
+        self.stream_state.setdefault(gid, {}).setdefault(username, {"notified": None})
+        self._persist_stream_state([gid])
         
         await interaction.followup.send(f"✅ Added Twitch streamer `{display_name}` (`{username}`)", ephemeral=True)
 
@@ -428,10 +1002,8 @@ class TwitchCog(commands.Cog):
                     
                 save_json(CONFIG_FILE, cfg_local)
                 
-                data = load_json(DATA_FILE)
-                if data.get(gid, {}).get("twitch", {}).get(chosen):
-                    del data[gid]["twitch"][chosen]
-                    save_json(DATA_FILE, data)
+                if self.stream_state.get(gid, {}).pop(chosen, None) is not None:
+                    self._persist_stream_state([gid])
                     
                 display_name = streamer_info.get(chosen, {}).get("display_name", chosen)
                 await select_interaction.response.edit_message(content=f"✅ Removed `{display_name}` (`{chosen}`)", view=None)
@@ -462,7 +1034,6 @@ class TwitchCog(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         cfg = load_json(CONFIG_FILE)
-        data = load_json(DATA_FILE)
         gid = str(interaction.guild_id)
         
         streamers = cfg.get(gid, {}).get("twitch", {}).get("streamers", [])
@@ -506,8 +1077,8 @@ class TwitchCog(commands.Cog):
                 stream = await self.bot.cogs["TwitchCog"]._fetch_stream(chosen)
                 
                 if stream:
-                    data.setdefault(gid, {}).setdefault("twitch", {}).setdefault(chosen, {})["notified"] = None
-                    save_json(DATA_FILE, data)
+                    self.stream_state.setdefault(gid, {}).setdefault(chosen, {})["notified"] = None
+                    self._persist_stream_state([gid])
                     
                     success = await self.bot.cogs["TwitchCog"]._send_stream_notification(
                         select_interaction.guild, channel, role, chosen, stream, force=True